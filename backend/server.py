@@ -1,19 +1,33 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from starlette.responses import Response, RedirectResponse, JSONResponse
+from starlette.datastructures import Headers
+from starlette.responses import Response, RedirectResponse, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
 import os
+import re
+import asyncio
+import bisect
+import functools
 import logging
 import httpx
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel, Field
 from typing import List, Optional
+from collections import OrderedDict, deque
 import uuid
 from datetime import datetime, timedelta
+from dateutil.relativedelta import relativedelta
 import hashlib
+import math
 import secrets
+import time
+import numpy as np
+import orjson
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError, InvalidHashError
 
@@ -27,17 +41,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _env_int(name: str, default: int, minimum: int, maximum: int) -> int:
+    """Read an integer setting from the environment, clamped to [minimum, maximum]."""
+    raw_value = os.getenv(name)
+    try:
+        value = int(raw_value) if raw_value is not None else default
+    except ValueError:
+        logger.warning(f"Invalid value for {name}: {raw_value!r}; using default {default}")
+        value = default
+    return max(minimum, min(value, maximum))
+
 # MongoDB connection with proper environment variable handling
 mongo_url = os.getenv('MONGO_URL', 'mongodb://localhost:27017')
 db_name = os.getenv('DB_NAME', 'emi_lock_db')
 
+# Connection pool sizing - keep warm connections so hot endpoints and background jobs don't queue
+MONGO_MAX_POOL_SIZE = _env_int("MONGO_MAX_POOL", 50, 1, 1000)
+MONGO_MIN_POOL_SIZE = _env_int("MONGO_MIN_POOL", 10, 0, MONGO_MAX_POOL_SIZE)
+# Fail fast instead of queueing indefinitely when every pooled connection is busy
+MONGO_WAIT_QUEUE_TIMEOUT_MS = _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 1000, 100, 60000)
+# Close surplus connections opened during bursts once they've sat idle (minPoolSize stays warm)
+MONGO_MAX_IDLE_TIME_MS = _env_int("MONGO_MAX_IDLE_TIME_MS", 30000, 1000, 3600000)
+
 logger.info(f"Connecting to MongoDB: {mongo_url[:20]}...")
 
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    serverSelectionTimeoutMS=5000
+)
 db = client[db_name]
 
 # Create the main app
-app = FastAPI(title="Loan Phone Lock API", version="1.0.0")
+# orjson-backed responses: faster serialization with native datetime support
+app = FastAPI(title="Loan Phone Lock API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -75,18 +115,26 @@ class AuthorizationException(ApplicationException):
     def __init__(self, message: str = "Permission denied.", correlation_id: str = None):
         super().__init__(message, "AUTHORIZATION_ERROR", correlation_id)
 
+class RateLimitException(ApplicationException):
+    """Raised when a client exceeds the allowed request rate"""
+    def __init__(self, message: str = "Too many requests. Please try again later.", correlation_id: str = None):
+        super().__init__(message, "RATE_LIMITED", correlation_id)
+
+# HTTP status for each application error code
+ERROR_STATUS_CODES = {
+    "VALIDATION_ERROR": 422,
+    "AUTHENTICATION_ERROR": 401,
+    "AUTHORIZATION_ERROR": 403,
+    "RATE_LIMITED": 429,
+}
+
 # Global exception handler to prevent server crashes
 @app.exception_handler(ApplicationException)
 async def application_exception_handler(request, exc: ApplicationException):
     """Handle custom application exceptions"""
     logger.error(f"Application exception [{exc.correlation_id}]: {exc.error_code} - {exc.message}")
-    status_codes = {
-        "VALIDATION_ERROR": 422,
-        "AUTHENTICATION_ERROR": 401,
-        "AUTHORIZATION_ERROR": 403,
-    }
-    status_code = status_codes.get(exc.error_code, 500)
-    return JSONResponse(
+    status_code = ERROR_STATUS_CODES.get(exc.error_code, 500)
+    return ORJSONResponse(
         status_code=status_code,
         content=exc.to_response()
     )
@@ -98,7 +146,7 @@ async def global_exception_handler(request, exc):
     # Log full details internally
     logger.error(f"Unhandled exception [{correlation_id}]: {type(exc).__name__}: {str(exc)}", exc_info=True)
     # Return sanitized response externally
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "An unexpected error occurred. Please try again later.",
@@ -109,11 +157,18 @@ async def global_exception_handler(request, exc):
 
 # ===================== HELPER FUNCTIONS =====================
 
+# Argon2 cost parameters, tunable per deployment so hashing lands near the target latency.
+# Bounds keep operators at or above the OWASP minimum (t=2 with 19 MiB).
+ARGON2_TIME_COST = _env_int("ARGON2_TIME_COST", 3, 2, 10)  # Number of iterations
+ARGON2_MEMORY_COST = _env_int("ARGON2_MEMORY_COST", 65536, 19456, 262144)  # KiB (default 64 MB)
+ARGON2_PARALLELISM = _env_int("ARGON2_PARALLELISM", 4, 1, 16)  # Number of parallel threads
+ARGON2_HASH_PREFIX = "$argon2"  # Every Argon2 variant's encoded hash starts with this
+
 # Initialize Argon2 password hasher with secure parameters
 _argon2_hasher = PasswordHasher(
-    time_cost=3,        # Number of iterations
-    memory_cost=65536,  # 64 MB
-    parallelism=4,      # Number of parallel threads
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
     hash_len=32,        # Length of the hash in bytes
     salt_len=16         # Length of random salt
 )
@@ -142,24 +197,189 @@ def verify_password(password: str, password_hash: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    # Check if it's a legacy SHA-256 hash (64 hex characters)
-    if len(password_hash) == 64 and all(c in '0123456789abcdef' for c in password_hash):
+    if is_legacy_hash(password_hash):
         # Legacy SHA-256 verification
         legacy_hash = hashlib.sha256(password.encode()).hexdigest()
         return legacy_hash == password_hash
     
+    # Anything that is neither legacy nor Argon2 can never match; skip the hasher entirely
+    if not password_hash.startswith(ARGON2_HASH_PREFIX):
+        return False
+    
     # Try Argon2id verification
     try:
         _argon2_hasher.verify(password_hash, password)
-        
-        # Check if hash needs rehashing (parameters changed)
-        if _argon2_hasher.check_needs_rehash(password_hash):
-            logger.info("Password hash needs rehashing with updated parameters")
-        
         return True
     except (VerifyMismatchError, InvalidHashError):
         return False
 
+def is_legacy_hash(password_hash: str) -> bool:
+    """Check if it's a legacy SHA-256 hash (64 hex characters)"""
+    return len(password_hash) == 64 and all(c in '0123456789abcdef' for c in password_hash)
+
+def password_needs_rehash(password_hash: str) -> bool:
+    """
+    Check whether a verified hash should be replaced.
+    True for legacy SHA-256 hashes and for Argon2 hashes created with
+    parameters other than the currently configured ones.
+    """
+    if is_legacy_hash(password_hash):
+        return True
+    try:
+        return _argon2_hasher.check_needs_rehash(password_hash)
+    except InvalidHashError:
+        return False
+
+# Dedicated pool for Argon2 work so password hashing never blocks the event loop
+_password_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 4,
+    thread_name_prefix="password-hash"
+)
+
+async def hash_password_async(password: str) -> str:
+    """Run hash_password on the password executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, hash_password, password)
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    """Run verify_password on the password executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, password, password_hash)
+
+async def bench_password_hashing() -> float:
+    """
+    Measure the cost of hashing a password with the configured parameters.
+    
+    Logged at startup so operators can tune ARGON2_TIME_COST / ARGON2_MEMORY_COST
+    towards the desired per-login latency. Runs a single hash on the password
+    executor so the event loop is never blocked.
+    
+    Returns:
+        Hashing time in milliseconds
+    """
+    started = time.perf_counter()
+    await hash_password_async("benchmark-password")
+    return (time.perf_counter() - started) * 1000
+
+# Number of reverse proxies in front of the app that append to X-Forwarded-For.
+# 0 ignores the header entirely, since clients can set it to anything.
+TRUSTED_PROXY_COUNT = _env_int("TRUSTED_PROXY_COUNT", 0, 0, 10)
+
+def get_client_ip(request: Request) -> str:
+    """
+    Resolve the caller's IP for rate limiting.
+    Only hops appended by the configured trusted proxies are believed: the
+    address is read TRUSTED_PROXY_COUNT entries from the right of
+    X-Forwarded-For, never from the client-controlled left end.
+    """
+    if TRUSTED_PROXY_COUNT:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+            if len(hops) >= TRUSTED_PROXY_COUNT:
+                return hops[-TRUSTED_PROXY_COUNT]
+    return request.client.host if request.client else "unknown"
+
+class SlidingWindowRateLimiter:
+    """
+    Per-IP sliding-window rate limiter usable as a FastAPI dependency.
+    Caps how often a single caller can trigger expensive password hashing.
+    State is kept in-process, so limits apply per worker.
+    """
+    
+    # Forget the least recently seen callers once this many are tracked
+    MAX_TRACKED_KEYS = 10000
+    
+    def __init__(self, limit: int, window_seconds: int):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._hits = OrderedDict()
+    
+    def hit(self, key: str) -> bool:
+        """Record a request for key. Returns False if the key is over its limit."""
+        now = time.monotonic()
+        window_start = now - self.window_seconds
+        
+        hits = self._hits.get(key)
+        if hits is None:
+            if len(self._hits) >= self.MAX_TRACKED_KEYS:
+                self._hits.popitem(last=False)
+            hits = self._hits[key] = deque()
+        else:
+            self._hits.move_to_end(key)
+        while hits and hits[0] <= window_start:
+            hits.popleft()
+        
+        if len(hits) >= self.limit:
+            return False
+        hits.append(now)
+        return True
+    
+    async def __call__(self, request: Request):
+        client_ip = get_client_ip(request)
+        if not self.hit(client_ip):
+            logger.warning(f"Rate limit exceeded for {client_ip} on {request.url.path}")
+            raise RateLimitException()
+
+login_rate_limiter = SlidingWindowRateLimiter(
+    limit=_env_int("LOGIN_RATE_LIMIT", 5, 1, 1000),
+    window_seconds=60
+)
+register_rate_limiter = SlidingWindowRateLimiter(
+    limit=_env_int("REGISTER_RATE_LIMIT", 3, 1, 1000),
+    window_seconds=600
+)
+
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-flight
+_background_tasks = set()
+
+def spawn_background_task(coro):
+    """Schedule a coroutine without awaiting it"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+class TTLCache:
+    """
+    Minimal in-process cache whose entries expire after a fixed time-to-live.
+    Bounded by maxsize; when full, expired entries are purged first and then
+    the oldest insertions are evicted.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = {}
+    
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires = entry
+        if time.monotonic() >= expires:
+            self._data.pop(key, None)
+            return default
+        return value
+    
+    def set(self, key, value, ttl: Optional[float] = None):
+        if key not in self._data and len(self._data) >= self.maxsize:
+            now = time.monotonic()
+            self._data = {k: v for k, v in self._data.items() if v[1] > now}
+            while len(self._data) >= self.maxsize:
+                self._data.pop(next(iter(self._data)))
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+    
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+    
+    def clear(self):
+        self._data.clear()
+    
+    def __len__(self):
+        return len(self._data)
+
 class SecureQueryBuilder:
     """
     Secure query builder to prevent NoSQL injection attacks.
@@ -347,8 +567,9 @@ def calculate_reducing_balance_emi(principal: float, annual_rate: float, months:
         total_interest = 0
     else:
         # EMI = [P × R × (1+R)^N] / [(1+R)^N-1]
-        power = (1 + monthly_rate) ** months
-        monthly_emi = (principal * monthly_rate * power) / (power - 1)
+        # (1+R)^N - 1 via expm1/log1p stays accurate for very small monthly rates
+        growth = math.expm1(months * math.log1p(monthly_rate))
+        monthly_emi = (principal * monthly_rate * (growth + 1)) / growth
         total_interest = (monthly_emi * months) - principal
     
     total_amount = principal + total_interest
@@ -385,6 +606,81 @@ def calculate_all_methods(principal: float, annual_rate: float, months: int) ->
         "flat_rate": calculate_flat_rate_emi(principal, annual_rate, months)
     }
 
+@functools.lru_cache(maxsize=4096)
+def compare_all_methods(principal: float, annual_rate: float, months: int) -> dict:
+    """calculate_all_methods plus savings comparison, memoized per (principal, rate, months)"""
+    comparison = calculate_all_methods(principal, annual_rate, months)
+    
+    # Add savings comparison
+    methods = [comparison["simple_interest"], comparison["reducing_balance"], comparison["flat_rate"]]
+    min_total = min(m["total_amount"] for m in methods)
+    
+    for method in methods:
+        method["savings_vs_highest"] = round(
+            max(m["total_amount"] for m in methods) - method["total_amount"], 2
+        )
+        method["is_cheapest"] = method["total_amount"] == min_total
+    
+    return comparison
+
+def iter_amortization_schedule(
+    principal: float,
+    monthly_rate: float,
+    monthly_emi: float,
+    months: int,
+    interest_per_month: Optional[float] = None
+):
+    """
+    Month-by-month amortization rows computed in closed form with NumPy.
+    Rows are yielded one at a time so callers can stream them.
+    
+    Args:
+        principal: Loan principal
+        monthly_rate: Monthly interest rate as a fraction (reducing balance only)
+        monthly_emi: Fixed monthly instalment
+        months: Number of instalments
+        interest_per_month: Fixed interest per instalment for flat/simple interest;
+            None for reducing balance, where interest accrues on the remaining principal
+        
+    Yields:
+        Dicts with month, emi, principal, interest and balance
+    """
+    elapsed = np.arange(months + 1, dtype=float)
+    
+    if interest_per_month is None:
+        # Balance after t payments: P(1+r)^t - EMI((1+r)^t - 1)/r
+        if monthly_rate == 0:
+            balance = principal - monthly_emi * elapsed
+        else:
+            growth = np.power(1 + monthly_rate, elapsed)
+            balance = principal * growth - monthly_emi * (growth - 1) / monthly_rate
+        interest = balance[:-1] * monthly_rate
+        principal_paid = monthly_emi - interest
+        remaining = balance[1:]
+    else:
+        interest = np.full(months, interest_per_month)
+        principal_paid = monthly_emi - interest
+        remaining = principal - principal_paid * elapsed[1:]
+    
+    emi = round(monthly_emi, 2)
+    for month, paid, charged, left in zip(
+        range(1, months + 1),
+        np.round(principal_paid, 2).tolist(),
+        np.round(interest, 2).tolist(),
+        np.round(np.maximum(remaining, 0), 2).tolist()
+    ):
+        yield {"month": month, "emi": emi, "principal": paid, "interest": charged, "balance": left}
+
+def build_amortization_schedule(
+    principal: float,
+    monthly_rate: float,
+    monthly_emi: float,
+    months: int,
+    interest_per_month: Optional[float] = None
+) -> List[dict]:
+    """Full amortization schedule as a list; see iter_amortization_schedule"""
+    return list(iter_amortization_schedule(principal, monthly_rate, monthly_emi, months, interest_per_month))
+
 def calculate_late_fee(principal_due: float, late_fee_percent: float, days_overdue: int) -> float:
     """Calculate late fee based on days overdue"""
     if days_overdue <= 0:
@@ -396,89 +692,205 @@ def calculate_late_fee(principal_due: float, late_fee_percent: float, days_overd
     
     return round(late_fee, 2)
 
+def calculate_late_fees(principal_due, late_fee_percent, days_overdue) -> np.ndarray:
+    """Vectorized calculate_late_fee over arrays of clients"""
+    principal_due = np.asarray(principal_due, dtype=float)
+    late_fee_percent = np.asarray(late_fee_percent, dtype=float)
+    days_overdue = np.asarray(days_overdue, dtype=float)
+    
+    months_overdue = days_overdue / 30  # Approximate months
+    late_fees = np.round((principal_due * late_fee_percent * months_overdue) / 100, 2)
+    return np.where(days_overdue > 0, late_fees, 0.0)
+
+# Maximum operations sent per bulk_write call
+BULK_WRITE_BATCH_SIZE = 500
+
+# Documents fetched per round-trip when streaming background job cursors
+CURSOR_BATCH_SIZE = 200
+
+# Only the fields the late fee job reads
+LATE_FEE_CLIENT_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "next_payment_due": 1,
+    "monthly_emi": 1,
+    "loan_plan_id": 1,
+    "late_fees_accumulated": 1,
+}
+
+async def _apply_late_fee_batch(batch: list, now: datetime):
+    """
+    Compute late fees for a batch of (client_id, next_payment_due, monthly_emi,
+    late_fee_rate, late_fees_accumulated) rows in one vectorized pass and write
+    them back with a single bulk_write.
+    """
+    client_ids, due_dates, monthly_emis, late_fee_rates, current_late_fees = zip(*batch)
+    
+    # Whole days overdue, floored like timedelta.days
+    days_overdue = (
+        np.datetime64(now, "us") - np.array(due_dates, dtype="datetime64[us]")
+    ) // np.timedelta64(1, "D")
+    
+    # Calculate late fee on monthly EMI
+    late_fees = calculate_late_fees(monthly_emis, late_fee_rates, days_overdue)
+    # Update client with accumulated late fees
+    new_late_fees = np.asarray(current_late_fees, dtype=float) + late_fees
+    
+    update_ops = []
+    for client_id, days, late_fee, total_late_fees in zip(
+        client_ids, days_overdue.tolist(), late_fees.tolist(), new_late_fees.tolist()
+    ):
+        if days <= 0:
+            continue
+        update_ops.append(UpdateOne(
+            {"id": client_id},
+            {"$set": {
+                "late_fees_accumulated": total_late_fees,
+                "days_overdue": days
+            }}
+        ))
+        logger.info(f"Applied late fee of €{late_fee} to client {client_id} ({days} days overdue)")
+    
+    if update_ops:
+        await db.clients.bulk_write(update_ops, ordered=False)
+
 async def apply_late_fees_to_overdue_clients():
     """Background job to calculate and apply late fees to overdue clients"""
     try:
-        # Get all clients with overdue payments
-        clients = await db.clients.find({
-            "next_payment_due": {"$lt": datetime.utcnow()},
+        now = datetime.utcnow()
+        overdue_query = {
+            "next_payment_due": {"$lt": now},
             "outstanding_balance": {"$gt": 0}
-        }).to_list(1000)
+        }
+        
+        # Batch load only the loan plans overdue clients reference, to avoid N+1 queries
+        plan_ids = [
+            plan_id for plan_id in await db.clients.distinct("loan_plan_id", overdue_query)
+            if plan_id
+        ]
+        loan_plans_dict = {}
+        if plan_ids:
+            loan_plans = await db.loan_plans.find(
+                {"id": {"$in": plan_ids}},
+                {"_id": 0, "id": 1, "late_fee_percent": 1}
+            ).to_list(len(plan_ids))
+            loan_plans_dict = {plan["id"]: plan for plan in loan_plans}
         
-        # Batch load all loan plans to avoid N+1 queries
-        loan_plans = await db.loan_plans.find().to_list(1000)
-        loan_plans_dict = {plan["id"]: plan for plan in loan_plans}
+        # Stream all clients with overdue payments, computing fees a batch at a time
+        clients = db.clients.find(overdue_query, LATE_FEE_CLIENT_PROJECTION).batch_size(CURSOR_BATCH_SIZE)
         
-        for client in clients:
-            days_overdue = (datetime.utcnow() - client["next_payment_due"]).days
+        batch = []
+        async for client in clients:
+            # Get late fee rate (from loan plan or default)
+            late_fee_rate = 2.0  # Default 2% per month
             
-            if days_overdue > 0:
-                # Get late fee rate (from loan plan or default)
-                late_fee_rate = 2.0  # Default 2% per month
-                
-                if client.get("loan_plan_id"):
-                    plan = loan_plans_dict.get(client["loan_plan_id"])
-                    if plan:
-                        late_fee_rate = plan.get("late_fee_percent", 2.0)
-                
-                # Calculate late fee on monthly EMI
-                monthly_emi = client.get("monthly_emi", 0)
-                late_fee = calculate_late_fee(monthly_emi, late_fee_rate, days_overdue)
-                
-                # Update client with accumulated late fees
-                current_late_fees = client.get("late_fees_accumulated", 0)
-                new_late_fees = current_late_fees + late_fee
-                
-                await db.clients.update_one(
-                    {"id": client["id"]},
-                    {"$set": {
-                        "late_fees_accumulated": new_late_fees,
-                        "days_overdue": days_overdue
-                    }}
-                )
-                
-                logger.info(f"Applied late fee of €{late_fee} to client {client['id']} ({days_overdue} days overdue)")
+            if client.get("loan_plan_id"):
+                plan = loan_plans_dict.get(client["loan_plan_id"])
+                if plan:
+                    late_fee_rate = plan.get("late_fee_percent", 2.0)
+            
+            batch.append((
+                client["id"],
+                client["next_payment_due"],
+                client.get("monthly_emi") or 0,
+                late_fee_rate,
+                client.get("late_fees_accumulated") or 0
+            ))
+            if len(batch) >= BULK_WRITE_BATCH_SIZE:
+                await _apply_late_fee_batch(batch, now)
+                batch = []
+        
+        if batch:
+            await _apply_late_fee_batch(batch, now)
     
     except Exception as e:
         logger.error(f"Late fee calculation error: {str(e)}")
 
-async def send_expo_push_notification(push_token: str, title: str, body: str, data: Optional[dict] = None) -> bool:
-    """Send a push notification via Expo."""
-    if not push_token:
-        return False
-    
-    payload = {
+EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+
+# Shared HTTP client so outbound calls reuse pooled keep-alive connections
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared outbound HTTP client, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    return _http_client
+
+# Expo accepts at most 100 messages per push request
+EXPO_PUSH_BATCH_SIZE = 100
+
+def build_expo_push_message(push_token: str, title: str, body: str, data: Optional[dict] = None) -> dict:
+    """Build a single Expo push message."""
+    return {
         "to": push_token,
         "sound": "default",
         "title": title,
         "body": body,
         "data": data or {}
     }
+
+async def send_expo_push_notifications(messages: List[dict]) -> int:
+    """
+    Send push notifications via Expo, up to 100 messages per request.
     
-    try:
-        async with httpx.AsyncClient(timeout=10) as http_client:
-            response = await http_client.post("https://exp.host/--/api/v2/push/send", json=payload)
+    Args:
+        messages: Messages built with build_expo_push_message
+        
+    Returns:
+        Number of messages Expo accepted
+    """
+    accepted = 0
+    http_client = get_http_client()
+    
+    for i in range(0, len(messages), EXPO_PUSH_BATCH_SIZE):
+        batch = messages[i:i + EXPO_PUSH_BATCH_SIZE]
+        try:
+            response = await http_client.post(EXPO_PUSH_URL, json=batch)
             if response.status_code >= httpx.codes.BAD_REQUEST:
-                logger.warning(f"Expo push send failed ({response.status_code})")
-                return False
-        return True
-    except Exception as exc:
-        logger.error(f"Expo push error: {exc}")
+                logger.warning(f"Expo push send failed ({response.status_code}) for {len(batch)} messages")
+                continue
+            tickets = response.json().get("data", [])
+        except Exception as exc:
+            logger.error(f"Expo push error: {exc}")
+            continue
+        
+        # Expo returns one ticket per message, in request order
+        for message, ticket in zip(batch, tickets):
+            if ticket.get("status") == "ok":
+                accepted += 1
+            else:
+                logger.warning(
+                    f"Expo push rejected for client {message['data'].get('client_id')}: "
+                    f"{ticket.get('message')} {ticket.get('details', {})}"
+                )
+    
+    return accepted
+
+async def send_expo_push_notification(push_token: str, title: str, body: str, data: Optional[dict] = None) -> bool:
+    """Send a push notification via Expo."""
+    if not push_token:
         return False
+    
+    message = build_expo_push_message(push_token, title, body, data)
+    return await send_expo_push_notifications([message]) == 1
 
 async def create_payment_reminders():
     """Background job to create payment reminders"""
     try:
-        from dateutil.relativedelta import relativedelta
-        
-        # Get all clients with active loans
-        clients = await db.clients.find({
+        # Stream all clients with active loans
+        clients = db.clients.find({
             "outstanding_balance": {"$gt": 0},
             "payment_reminders_enabled": True,
             "next_payment_due": {"$exists": True}
-        }).to_list(1000)
+        }).batch_size(CURSOR_BATCH_SIZE)
         
-        for client in clients:
+        push_messages = []
+        async for client in clients:
             next_due = client.get("next_payment_due")
             if not next_due:
                 continue
@@ -500,13 +912,13 @@ async def create_payment_reminders():
                         "client_id": client["id"],
                         "reminder_type": reminder_type,
                         "scheduled_date": {"$gte": datetime.utcnow() - relativedelta(days=1)}
-                    })
+                    }, {"_id": 1})
                     
                     if not existing:
                         # Create reminder
                         admin_scope = client.get("admin_id")
                         if admin_scope:
-                            admin_exists = await db.admins.find_one({"id": admin_scope})
+                            admin_exists = await db.admins.find_one({"id": admin_scope}, {"_id": 1})
                             if not admin_exists:
                                 admin_scope = None
                         
@@ -519,10 +931,10 @@ async def create_payment_reminders():
                         )
                         await db.reminders.insert_one(reminder.dict())
                         
-                        # Send Expo push notification if token available
+                        # Queue Expo push notification if token available
                         push_token = client.get("expo_push_token")
                         if push_token:
-                            await send_expo_push_notification(
+                            push_messages.append(build_expo_push_message(
                                 push_token,
                                 "Payment Reminder",
                                 reminder.message,
@@ -531,8 +943,13 @@ async def create_payment_reminders():
                                     "reminder_type": reminder_type,
                                     "admin_id": admin_scope
                                 }
-                            )
+                            ))
                         logger.info(f"Created {reminder_type} reminder for client {client['id']}")
+        
+        # Send all queued notifications in bulk requests
+        if push_messages:
+            sent = await send_expo_push_notifications(push_messages)
+            logger.info(f"Sent {sent}/{len(push_messages)} payment reminder push notifications")
     
     except Exception as e:
         logger.error(f"Reminder creation error: {str(e)}")
@@ -544,10 +961,10 @@ def check_and_auto_lock_overdue_payments():
         import asyncio
         
         async def auto_lock_job():
-            # Get all clients with auto-lock enabled (limit to 1000 for performance)
-            clients = await db.clients.find({"auto_lock_enabled": True}).to_list(1000)
+            # Stream all clients with auto-lock enabled
+            clients = db.clients.find({"auto_lock_enabled": True}).batch_size(CURSOR_BATCH_SIZE)
             
-            for client in clients:
+            async for client in clients:
                 if not client.get("next_payment_due"):
                     continue
                 
@@ -567,6 +984,7 @@ def check_and_auto_lock_overdue_payments():
                             "days_overdue": days_overdue
                         }}
                     )
+                    invalidate_device_status(client["id"])
                     logger.warning(f"Auto-locked client {client['id']} - {days_overdue} days overdue")
                 else:
                     # Update days overdue counter
@@ -584,8 +1002,12 @@ def check_and_auto_lock_overdue_payments():
 
 # ===================== MODELS =====================
 
+def new_id() -> str:
+    """Random 128-bit document id as 32 hex characters"""
+    return secrets.token_hex(16)
+
 class Admin(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     username: str
     password_hash: str
     role: str = "user"  # "admin" or "user"
@@ -615,7 +1037,7 @@ class AdminResponse(BaseModel):
     token: str
 
 class LoanPlan(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     name: str  # e.g., "Standard Plan", "Premium Plan"
     interest_rate: float  # Annual percentage
     min_tenure_months: int = 3
@@ -637,7 +1059,7 @@ class LoanPlanCreate(BaseModel):
     description: str = ""
 
 class Reminder(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     client_id: str
     reminder_type: str  # "payment_due", "overdue", "final_notice"
     scheduled_date: datetime
@@ -648,7 +1070,7 @@ class Reminder(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class Client(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     name: str
     phone: str
     email: str = ""  # Made optional with default empty string for backwards compatibility
@@ -710,7 +1132,7 @@ class Client(BaseModel):
     admin_mode_active: bool = False  # Device Admin mode active on device
 
 class Payment(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     client_id: str
     amount: float
     payment_date: datetime = Field(default_factory=datetime.utcnow)
@@ -794,6 +1216,125 @@ class ClientStatusResponse(BaseModel):
 # Token configuration
 TOKEN_EXPIRY_HOURS = 24  # 24-hour token lifetime as per security requirements
 
+# Short-lived cache of token -> (admin_id, expires_at) to skip a Mongo round-trip per request.
+# Keyed by a digest so raw tokens are never held in memory.
+TOKEN_CACHE_TTL_SECONDS = 300
+_token_cache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL_SECONDS)
+
+# Requester profile behind a token, used for role checks on admin endpoints
+ADMIN_CACHE_TTL_SECONDS = 30
+ADMIN_PROFILE_PROJECTION = {"_id": 0, "id": 1, "username": 1, "role": 1, "is_super_admin": 1}
+ADMIN_LOOKUP_PROJECTION = {"id": 1, "username": 1, "role": 1, "is_super_admin": 1}
+_admin_cache = TTLCache(maxsize=10000, ttl=ADMIN_CACHE_TTL_SECONDS)
+
+# admin_id -> cache key of that admin's token (admin_tokens is unique on admin_id)
+_admin_token_keys = {}
+
+def token_cache_key(token: str) -> str:
+    """Digest of an admin token used as its cache key"""
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+def cache_token_record(cache_key: str, record: tuple):
+    """Cache a (admin_id, expires_at) token record and index it by admin"""
+    _token_cache.set(cache_key, record)
+    _admin_token_keys[record[0]] = cache_key
+
+def evict_admin_sessions(admin_id: str):
+    """Drop every cached token and profile entry for an admin"""
+    cache_key = _admin_token_keys.pop(admin_id, None)
+    if cache_key:
+        _token_cache.pop(cache_key)
+    _admin_cache.pop(admin_id)
+
+async def get_token_record(token: str) -> Optional[tuple]:
+    """
+    Resolve an admin token to its (admin_id, expires_at) pair.
+    Checks both token existence and expiration, serving repeat lookups from
+    the in-process token cache.
+    
+    Args:
+        token: The admin token to resolve
+        
+    Returns:
+        (admin_id, expires_at) if the token is valid and not expired, None otherwise
+    """
+    if not token:
+        return None
+    
+    cache_key = token_cache_key(token)
+    cached = _token_cache.get(cache_key)
+    if cached is None:
+        token_doc = await db.admin_tokens.find_one(
+            {"token": token},
+            {"_id": 0, "admin_id": 1, "expires_at": 1}
+        )
+        if not token_doc:
+            return None
+        cached = (token_doc["admin_id"], token_doc.get("expires_at"))
+        cache_token_record(cache_key, cached)
+    
+    if await discard_if_expired(token, cache_key, cached):
+        return None
+    
+    return cached
+
+async def discard_if_expired(token: str, cache_key: str, record: tuple) -> bool:
+    """Remove an expired token from the cache and database; True if it was expired"""
+    expires_at = record[1]
+    if expires_at and datetime.utcnow() > expires_at:
+        _token_cache.pop(cache_key)
+        await db.admin_tokens.delete_one({"token": token})
+        return True
+    return False
+
+async def get_token_admin_id(token: str) -> Optional[str]:
+    """Resolve an admin token to the owning admin_id, or None if invalid or expired"""
+    record = await get_token_record(token)
+    return record[0] if record else None
+
+async def resolve_admin(token: str) -> Optional[dict]:
+    """
+    Resolve an admin token to the requester's profile.
+    
+    Args:
+        token: The admin token to resolve
+        
+    Returns:
+        Dict with id, username, role and is_super_admin, or None if the token
+        is invalid or the admin no longer exists
+    """
+    if not token:
+        return None
+    
+    cache_key = token_cache_key(token)
+    record = _token_cache.get(cache_key)
+    
+    if record is None:
+        # Cold token: fetch the token and its admin in a single round-trip
+        joined = await db.admin_tokens.aggregate([
+            {"$match": {"token": token}},
+            {"$lookup": {"from": "admins", "localField": "admin_id", "foreignField": "id", "as": "admin"}},
+            {"$unwind": "$admin"},
+            {"$project": {"_id": 0, "admin_id": 1, "expires_at": 1, "admin": ADMIN_LOOKUP_PROJECTION}},
+        ]).to_list(1)
+        if not joined:
+            return None
+        record = (joined[0]["admin_id"], joined[0].get("expires_at"))
+        cache_token_record(cache_key, record)
+        _admin_cache.set(record[0], joined[0]["admin"])
+    
+    if await discard_if_expired(token, cache_key, record):
+        return None
+    
+    admin_id = record[0]
+    admin = _admin_cache.get(admin_id)
+    if admin is None:
+        admin = await db.admins.find_one({"id": admin_id}, ADMIN_PROFILE_PROJECTION)
+        if not admin:
+            return None
+        _admin_cache.set(admin_id, admin)
+    return admin
+
 async def verify_admin_token_header(token: str) -> bool:
     """
     Helper function to verify admin token.
@@ -805,18 +1346,7 @@ async def verify_admin_token_header(token: str) -> bool:
     Returns:
         True if token is valid and not expired, False otherwise
     """
-    token_doc = await db.admin_tokens.find_one({"token": token})
-    if not token_doc:
-        return False
-    
-    # Check if token has expired
-    if "expires_at" in token_doc:
-        if datetime.utcnow() > token_doc["expires_at"]:
-            # Token expired, remove it
-            await db.admin_tokens.delete_one({"token": token})
-            return False
-    
-    return True
+    return await get_token_admin_id(token) is not None
 
 async def enforce_client_scope(client: dict, admin_id: Optional[str]):
     """Ensure the requested client belongs to the provided admin scope"""
@@ -827,7 +1357,46 @@ async def enforce_client_scope(client: dict, admin_id: Optional[str]):
         logger.warning(f"Admin {admin_id} attempted to access unassigned client {client['id']}")
         raise AuthorizationException("Client not assigned to this admin")
 
-@api_router.post("/admin/register", response_model=AdminResponse)
+# Short-lived response caches for the hottest read endpoints (per worker process).
+# Devices poll their status continuously; loan plans change rarely; dashboards poll the
+# collection report, which background jobs may leave up to its TTL stale.
+DEVICE_STATUS_CACHE_TTL_SECONDS = 3
+LOAN_PLANS_CACHE_TTL_SECONDS = 15
+COLLECTION_REPORT_CACHE_TTL_SECONDS = 10
+_device_status_cache = TTLCache(maxsize=10000, ttl=DEVICE_STATUS_CACHE_TTL_SECONDS)
+_loan_plans_cache = TTLCache(maxsize=1000, ttl=LOAN_PLANS_CACHE_TTL_SECONDS)
+_report_cache = TTLCache(maxsize=1000, ttl=COLLECTION_REPORT_CACHE_TTL_SECONDS)
+
+def invalidate_device_status(client_id: str):
+    """Drop a cached device status after the client's lock/warning state changes"""
+    _device_status_cache.pop(client_id)
+
+def invalidate_loan_plans(admin_id: Optional[str]):
+    """Drop both cached loan plan listings for an admin"""
+    _loan_plans_cache.pop((admin_id, True))
+    _loan_plans_cache.pop((admin_id, False))
+
+def invalidate_collection_report(*admin_ids: Optional[str]):
+    """Drop the cached collection reports for the given admins and the unscoped report"""
+    for admin_id in admin_ids:
+        _report_cache.pop(admin_id)
+    _report_cache.pop(None)
+
+# Fields enforce_client_scope needs
+CLIENT_SCOPE_PROJECTION = {"_id": 0, "id": 1, "admin_id": 1}
+
+def client_scope_filter(client_id: str, admin_id: Optional[str]) -> dict:
+    """Query filter that only matches the client when enforce_client_scope would allow it"""
+    return {"id": client_id, "admin_id": admin_id or {"$in": [None, ""]}}
+
+async def raise_client_scope_miss(client_id: str, admin_id: Optional[str]):
+    """Raise the right error after a client_scope_filter query matched nothing"""
+    client = await db.clients.find_one({"id": client_id}, CLIENT_SCOPE_PROJECTION)
+    if client:
+        await enforce_client_scope(client, admin_id)
+    raise HTTPException(status_code=404, detail="Client not found")
+
+@api_router.post("/admin/register", response_model=AdminResponse, dependencies=[Depends(register_rate_limiter)])
 async def register_admin(admin_data: AdminCreate, admin_token: str = Query(default=None)):
     # Validate password length
     if len(admin_data.password) < 6:
@@ -842,22 +1411,22 @@ async def register_admin(admin_data: AdminCreate, admin_token: str = Query(defau
             raise AuthenticationException("Admin token required to register new users")
         
         # Get the creator's info
-        token_data = await db.admin_tokens.find_one({"token": admin_token})
-        if not token_data:
+        creator_id = await get_token_admin_id(admin_token)
+        if not creator_id:
             raise AuthenticationException("Invalid admin token")
         
-        creator = await db.admins.find_one({"id": token_data["admin_id"]})
+        creator = await db.admins.find_one({"id": creator_id}, {"_id": 0, "role": 1})
         if not creator or creator.get("role") != "admin":
             raise AuthorizationException("Only admins can create new users")
     
     # Check if username already exists
-    existing = await db.admins.find_one({"username": admin_data.username})
+    existing = await db.admins.find_one({"username": admin_data.username}, {"_id": 1})
     if existing:
         raise ValidationException("Username already exists")
     
     admin = Admin(
         username=admin_data.username,
-        password_hash=hash_password(admin_data.password),
+        password_hash=await hash_password_async(admin_data.password),
         role=admin_data.role if not is_first_admin else "admin",
         is_super_admin=is_first_admin,
         first_name=admin_data.first_name,
@@ -883,34 +1452,55 @@ async def register_admin(admin_data: AdminCreate, admin_token: str = Query(defau
         token=token
     )
 
-@api_router.post("/admin/login", response_model=AdminResponse)
-async def login_admin(login_data: AdminLogin):
-    admin = await db.admins.find_one({"username": login_data.username})
-    if not admin or not verify_password(login_data.password, admin["password_hash"]):
-        raise AuthenticationException("Invalid credentials")
-    
-    # Check if password needs rehashing (for legacy SHA-256 hashes)
-    if len(admin["password_hash"]) == 64:
-        # Legacy SHA-256 hash detected - rehash with Argon2id
-        logger.info(f"Migrating password hash for user {admin['username']} to Argon2id")
-        new_hash = hash_password(login_data.password)
+async def rehash_admin_password(admin_id: str, username: str, password: str, old_hash: str):
+    """
+    Re-hash a verified password with the current Argon2 parameters and store it.
+    Only replaces old_hash, so a password change made meanwhile is never reverted.
+    """
+    try:
+        logger.info(f"Rehashing password for user {username} with current Argon2id parameters")
+        new_hash = await hash_password_async(password)
         await db.admins.update_one(
-            {"id": admin["id"]},
+            {"id": admin_id, "password_hash": old_hash},
             {"$set": {"password_hash": new_hash}}
         )
+    except Exception as e:
+        logger.error(f"Password rehash error for user {username}: {str(e)}")
+
+@api_router.post("/admin/login", response_model=AdminResponse, dependencies=[Depends(login_rate_limiter)])
+async def login_admin(login_data: AdminLogin):
+    admin = await db.admins.find_one(
+        {"username": login_data.username},
+        {"_id": 0, "id": 1, "username": 1, "password_hash": 1, "role": 1, "is_super_admin": 1}
+    )
+    if not admin or not await verify_password_async(login_data.password, admin["password_hash"]):
+        raise AuthenticationException("Invalid credentials")
+    
+    # Migrate legacy SHA-256 hashes and hashes made with outdated Argon2 parameters.
+    # Runs in the background so login latency is unchanged.
+    if password_needs_rehash(admin["password_hash"]):
+        spawn_background_task(rehash_admin_password(
+            admin["id"], admin["username"], login_data.password, admin["password_hash"]
+        ))
     
     # Generate token with expiration
     token = secrets.token_hex(32)
     expires_at = datetime.utcnow() + timedelta(hours=TOKEN_EXPIRY_HOURS)
-    await db.admin_tokens.update_one(
+    # Replace the admin's single token document (unique on admin_id)
+    previous_token = await db.admin_tokens.find_one_and_replace(
         {"admin_id": admin["id"]},
-        {"$set": {
+        {
+            "admin_id": admin["id"],
             "token": token,
             "created_at": datetime.utcnow(),
             "expires_at": expires_at
-        }},
+        },
+        projection={"_id": 0, "token": 1},
         upsert=True
     )
+    # The rotated-out token must stop working immediately
+    if previous_token:
+        _token_cache.pop(token_cache_key(previous_token["token"]))
     
     return AdminResponse(
         id=admin["id"], 
@@ -923,15 +1513,15 @@ async def login_admin(login_data: AdminLogin):
 @api_router.get("/admin/verify/{token}")
 async def verify_admin_token(token: str):
     """Verify if a token is valid and not expired"""
-    is_valid = await verify_admin_token_header(token)
-    if not is_valid:
+    record = await get_token_record(token)
+    if not record:
         raise AuthenticationException("Invalid or expired token")
     
-    token_doc = await db.admin_tokens.find_one({"token": token})
+    admin_id, expires_at = record
     return {
         "valid": True,
-        "admin_id": token_doc["admin_id"],
-        "expires_at": token_doc.get("expires_at").isoformat() if token_doc.get("expires_at") else None
+        "admin_id": admin_id,
+        "expires_at": expires_at.isoformat() if expires_at else None
     }
 
 # ===================== ADMIN MANAGEMENT ROUTES =====================
@@ -951,12 +1541,11 @@ class AdminListResponse(BaseModel):
 async def list_admins(admin_token: str = Query(...)):
     """List all users (requires admin role)"""
     # Verify token and check if requester is an admin
-    token_doc = await db.admin_tokens.find_one({"token": admin_token})
-    if not token_doc:
+    requester = await resolve_admin(admin_token)
+    if not requester:
         raise AuthenticationException("Invalid admin token")
     
-    requester = await db.admins.find_one({"id": token_doc["admin_id"]})
-    if not requester or requester.get("role") != "admin":
+    if requester.get("role") != "admin":
         raise AuthorizationException("Only admins can view user list")
     
     admins = await db.admins.find().to_list(100)
@@ -975,24 +1564,26 @@ async def change_password(password_data: PasswordChange, admin_token: str = Quer
     if len(password_data.new_password) < 6:
         raise ValidationException("New password must be at least 6 characters")
     
-    token_doc = await db.admin_tokens.find_one({"token": admin_token})
-    if not token_doc:
+    requester_id = await get_token_admin_id(admin_token)
+    if not requester_id:
         raise AuthenticationException("Invalid admin token")
     
-    admin = await db.admins.find_one({"id": token_doc["admin_id"]})
+    admin = await db.admins.find_one({"id": requester_id}, {"_id": 0, "id": 1, "password_hash": 1})
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
     
     # Verify current password
-    if not verify_password(password_data.current_password, admin["password_hash"]):
+    if not await verify_password_async(password_data.current_password, admin["password_hash"]):
         raise AuthenticationException("Current password is incorrect")
     
     # Update password
-    new_hash = hash_password(password_data.new_password)
+    new_hash = await hash_password_async(password_data.new_password)
     await db.admins.update_one(
         {"id": admin["id"]},
         {"$set": {"password_hash": new_hash}}
     )
+    # Force the next request to re-check the session against the database
+    evict_admin_sessions(admin["id"])
     
     return {"message": "Password changed successfully"}
 
@@ -1005,13 +1596,9 @@ class ProfileUpdate(BaseModel):
 @api_router.put("/admin/update-profile")
 async def update_admin_profile(profile_data: ProfileUpdate, admin_token: str = Query(...)):
     """Update admin profile information"""
-    token_doc = await db.admin_tokens.find_one({"token": admin_token})
-    if not token_doc:
-        raise AuthenticationException("Invalid admin token")
-    
-    admin = await db.admins.find_one({"id": token_doc["admin_id"]})
+    admin = await resolve_admin(admin_token)
     if not admin:
-        raise HTTPException(status_code=404, detail="Admin not found")
+        raise AuthenticationException("Invalid admin token")
     
     # Update profile fields
     update_data = {
@@ -1040,39 +1627,55 @@ async def update_admin_profile_alias(profile_data: ProfileUpdate, admin_token: s
 @api_router.delete("/admin/{admin_id}")
 async def delete_admin(admin_id: str, admin_token: str = Query(...)):
     """Delete a user (requires admin role, cannot delete yourself, super admin, or last admin)"""
-    token_doc = await db.admin_tokens.find_one({"token": admin_token})
-    if not token_doc:
+    requester = await resolve_admin(admin_token)
+    if not requester:
         raise AuthenticationException("Invalid admin token")
     
     # Check if requester is an admin
-    requester = await db.admins.find_one({"id": token_doc["admin_id"]})
-    if not requester or requester.get("role") != "admin":
+    if requester.get("role") != "admin":
         raise AuthorizationException("Only admins can delete users")
     
     # Cannot delete yourself
-    if token_doc["admin_id"] == admin_id:
+    if requester["id"] == admin_id:
         raise ValidationException("Cannot delete your own account")
     
-    # Check if target user is super admin
-    target_user = await db.admins.find_one({"id": admin_id})
+    # Load the target user and the admin headcount in one round-trip
+    facets = await db.admins.aggregate([
+        {"$facet": {
+            "target": [
+                {"$match": {"id": admin_id}},
+                {"$limit": 1},
+                {"$project": {"_id": 0, "role": 1, "is_super_admin": 1}}
+            ],
+            "admins": [{"$match": {"role": "admin"}}, {"$count": "n"}]
+        }}
+    ]).to_list(1)
+    target_user = facets[0]["target"][0] if facets[0]["target"] else None
+    admin_count = facets[0]["admins"][0]["n"] if facets[0]["admins"] else 0
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    # Check if target user is super admin
     if target_user.get("is_super_admin", False):
         raise AuthorizationException("Cannot delete super admin")
     
     # Check if this is the last admin
-    admin_count = await db.admins.count_documents({"role": "admin"})
     if admin_count <= 1 and target_user.get("role") == "admin":
         raise ValidationException("Cannot delete the last admin")
     
-    # Delete user
-    result = await db.admins.delete_one({"id": admin_id})
+    # The filter re-checks super admin status so a concurrent promotion can't slip through
+    result = await db.admins.delete_one({"id": admin_id, "is_super_admin": {"$ne": True}})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Delete associated token
-    await db.admin_tokens.delete_one({"admin_id": admin_id})
+    # Only log the user out once they are actually gone
+    deleted_token = await db.admin_tokens.find_one_and_delete(
+        {"admin_id": admin_id},
+        projection={"_id": 0, "token": 1}
+    )
+    if deleted_token:
+        _token_cache.pop(token_cache_key(deleted_token["token"]))
+    evict_admin_sessions(admin_id)
     
     return {"message": "User deleted successfully"}
 
@@ -1083,10 +1686,9 @@ async def create_client(client_data: ClientCreate, admin_token: Optional[str] =
     admin_id = client_data.admin_id
     
     if admin_token:
-        token_doc = await db.admin_tokens.find_one({"token": admin_token})
-        if not token_doc:
+        admin_id = await get_token_admin_id(admin_token)
+        if not admin_id:
             raise AuthenticationException("Invalid admin token")
-        admin_id = token_doc["admin_id"]
     
     client_payload = client_data.dict()
     if admin_id:
@@ -1094,15 +1696,22 @@ async def create_client(client_data: ClientCreate, admin_token: Optional[str] =
     
     client = Client(**client_payload)
     await db.clients.insert_one(client.dict())
+    invalidate_collection_report(client.admin_id)
     return client
 
 @api_router.get("/clients")
-async def get_all_clients(skip: int = Query(default=0), limit: int = Query(default=100), admin_id: Optional[str] = Query(default=None)):
+async def get_all_clients(
+    skip: int = Query(default=0),
+    limit: int = Query(default=100),
+    admin_id: Optional[str] = Query(default=None),
+    has_outstanding: Optional[bool] = Query(default=None)
+):
     """Get all clients with pagination
     
     Args:
         skip: Number of records to skip (default: 0)
         limit: Maximum number of records to return (default: 100, max: 500)
+        has_outstanding: Only clients with (true) or without (false) an outstanding loan balance
     """
     # Cap limit at 500 to prevent excessive data transfer
     limit = min(limit, 500)
@@ -1112,16 +1721,23 @@ async def get_all_clients(skip: int = Query(default=0), limit: int = Query(defau
         raise ValidationException("admin_id is required for client listings")
     
     query = {"admin_id": admin_id}
-    
-    # Get total count for pagination metadata
-    total_count = await db.clients.count_documents(query)
-    
-    # Fetch paginated clients - removed projection to avoid Pydantic validation errors
-    # The Client model requires all fields, projection would cause missing field errors
-    clients = await db.clients.find(query).skip(skip).limit(limit).to_list(limit)
+    # Served by the (admin_id, outstanding_balance) index
+    if has_outstanding is True:
+        query["outstanding_balance"] = {"$gt": 0}
+    elif has_outstanding is False:
+        query["outstanding_balance"] = {"$not": {"$gt": 0}}
+    
+    # Count for pagination metadata and fetch the page concurrently.
+    # No projection: the Client model requires all fields.
+    # batch_size(limit) returns the whole page in one wire batch instead of 101 docs + getMore.
+    total_count, clients = await asyncio.gather(
+        db.clients.count_documents(query),
+        db.clients.find(query).skip(skip).limit(limit).batch_size(limit).to_list(limit)
+    )
     
     return {
-        "clients": [Client(**c) for c in clients],
+        # Stored documents were validated on write; skip the ~50-field validation per row
+        "clients": [Client.model_construct(**c) for c in clients],
         "pagination": {
             "total": total_count,
             "skip": skip,
@@ -1137,35 +1753,41 @@ async def get_client(client_id: str, admin_id: Optional[str] = Query(default=Non
         raise HTTPException(status_code=404, detail="Client not found")
     
     await enforce_client_scope(client, admin_id)
-    return Client(**client)
+    # response_model validates and serializes the document once
+    return client
 
 @api_router.put("/clients/{client_id}", response_model=Client)
 async def update_client(client_id: str, update_data: ClientUpdate, admin_id: Optional[str] = Query(default=None)):
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    await enforce_client_scope(client, admin_id)
-    
+    scope = client_scope_filter(client_id, admin_id)
     update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
     if update_dict:
-        await db.clients.update_one({"id": client_id}, {"$set": update_dict})
+        # Read the document as it was so a reassigned client's previous owner is invalidated too
+        previous_client = await db.clients.find_one_and_update(
+            scope,
+            {"$set": update_dict},
+            return_document=ReturnDocument.BEFORE
+        )
+    else:
+        previous_client = await db.clients.find_one(scope)
+    if not previous_client:
+        await raise_client_scope_miss(client_id, admin_id)
+    updated_client = {**previous_client, **update_dict}
+    invalidate_device_status(client_id)
+    invalidate_collection_report(admin_id, previous_client.get("admin_id"), updated_client.get("admin_id"))
     
-    updated_client = await db.clients.find_one({"id": client_id})
     return Client(**updated_client)
 
 @api_router.post("/clients/{client_id}/allow-uninstall")
 async def allow_uninstall(client_id: str, admin_id: Optional[str] = Query(default=None)):
     """Signal device to allow app uninstallation - must be called before deletion"""
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    await enforce_client_scope(client, admin_id)
-    
     # Mark client as ready for uninstall
-    await db.clients.update_one(
-        {"id": client_id},
+    result = await db.clients.update_one(
+        client_scope_filter(client_id, admin_id),
         {"$set": {"uninstall_allowed": True}}
     )
+    if result.matched_count == 0:
+        await raise_client_scope_miss(client_id, admin_id)
+    invalidate_device_status(client_id)
     
     logger.info(f"Client {client_id} marked for uninstallation")
     
@@ -1176,21 +1798,24 @@ async def allow_uninstall(client_id: str, admin_id: Optional[str] = Query(defaul
 
 @api_router.delete("/clients/{client_id}")
 async def delete_client(client_id: str, admin_id: Optional[str] = Query(default=None)):
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    await enforce_client_scope(client, admin_id)
-    
-    # Check if uninstall was allowed first
-    if not client.get("uninstall_allowed", False):
+    # Scope and the uninstall precondition are both part of the filter
+    deleted_client = await db.clients.find_one_and_delete(
+        {**client_scope_filter(client_id, admin_id), "uninstall_allowed": True},
+        projection={"_id": 0, "admin_id": 1}
+    )
+    if not deleted_client:
+        client = await db.clients.find_one({"id": client_id}, CLIENT_SCOPE_PROJECTION)
+        if not client:
+            raise HTTPException(status_code=404, detail="Client not found")
+        await enforce_client_scope(client, admin_id)
+        
+        # Uninstall must be allowed first
         raise HTTPException(
             status_code=400, 
             detail="Must signal device to allow uninstall first. Use the 'Allow Uninstall' button before deleting."
         )
-    
-    result = await db.clients.delete_one({"id": client_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Client not found")
+    invalidate_device_status(client_id)
+    invalidate_collection_report(admin_id, deleted_client.get("admin_id"))
     
     logger.info(f"Client {client_id} deleted successfully")
     return {"message": "Client deleted successfully"}
@@ -1199,73 +1824,85 @@ async def delete_client(client_id: str, admin_id: Optional[str] = Query(default=
 
 @api_router.post("/clients/{client_id}/lock")
 async def lock_client_device(client_id: str, message: Optional[str] = None, admin_id: Optional[str] = Query(default=None)):
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    await enforce_client_scope(client, admin_id)
-    
     update_data = {"is_locked": True}
     if message:
         update_data["lock_message"] = message
     
-    await db.clients.update_one({"id": client_id}, {"$set": update_data})
+    result = await db.clients.update_one(client_scope_filter(client_id, admin_id), {"$set": update_data})
+    if result.matched_count == 0:
+        await raise_client_scope_miss(client_id, admin_id)
+    invalidate_device_status(client_id)
     return {"message": "Device locked successfully"}
 
 @api_router.post("/clients/{client_id}/unlock")
 async def unlock_client_device(client_id: str, admin_id: Optional[str] = Query(default=None)):
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    await enforce_client_scope(client, admin_id)
-    
-    await db.clients.update_one({"id": client_id}, {"$set": {"is_locked": False, "warning_message": ""}})
+    result = await db.clients.update_one(
+        client_scope_filter(client_id, admin_id),
+        {"$set": {"is_locked": False, "warning_message": ""}}
+    )
+    if result.matched_count == 0:
+        await raise_client_scope_miss(client_id, admin_id)
+    invalidate_device_status(client_id)
     return {"message": "Device unlocked successfully"}
 
 @api_router.post("/clients/{client_id}/warning")
 async def send_warning(client_id: str, message: str, admin_id: Optional[str] = Query(default=None)):
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    await enforce_client_scope(client, admin_id)
-    
-    await db.clients.update_one({"id": client_id}, {"$set": {"warning_message": message}})
+    result = await db.clients.update_one(client_scope_filter(client_id, admin_id), {"$set": {"warning_message": message}})
+    if result.matched_count == 0:
+        await raise_client_scope_miss(client_id, admin_id)
+    invalidate_device_status(client_id)
     return {"message": "Warning sent successfully"}
 
 # ===================== CLIENT DEVICE ROUTES =====================
 
+# Case-insensitive matching for registration codes, served by the collated unique index
+REGISTRATION_CODE_COLLATION = {"locale": "en", "strength": 2}
+
 @api_router.post("/device/register")
 async def register_device(registration: DeviceRegistration):
-    client = await db.clients.find_one({"registration_code": registration.registration_code.upper()})
-    if not client:
-        raise HTTPException(status_code=404, detail="Invalid registration code")
-    
-    if client.get("is_registered"):
-        raise ValidationException("Device already registered")
+    registration_code = registration.registration_code
     
     # Extract device make (brand) from device_model string
     device_make = registration.device_model.split()[0] if registration.device_model else ""
     
-    await db.clients.update_one(
-        {"id": client["id"]},
+    # Claim the code atomically so two devices cannot register against the same client
+    updated_client = await db.clients.find_one_and_update(
+        {"registration_code": registration_code, "is_registered": {"$ne": True}},
         {"$set": {
             "device_id": registration.device_id,
             "device_model": registration.device_model,
             "device_make": device_make,
             "is_registered": True,
             "registered_at": datetime.utcnow()
-        }}
+        }},
+        return_document=ReturnDocument.AFTER,
+        collation=REGISTRATION_CODE_COLLATION
     )
+    if not updated_client:
+        if await db.clients.find_one(
+            {"registration_code": registration_code}, {"_id": 1}, collation=REGISTRATION_CODE_COLLATION
+        ):
+            raise ValidationException("Device already registered")
+        raise HTTPException(status_code=404, detail="Invalid registration code")
     
-    updated_client = await db.clients.find_one({"id": client["id"]})
-    return {"message": "Device registered successfully", "client_id": client["id"], "client": Client(**updated_client).dict()}
+    return {"message": "Device registered successfully", "client_id": updated_client["id"], "client": Client(**updated_client)}
+
+DEVICE_STATUS_PROJECTION = {
+    "_id": 0, "id": 1, "name": 1, "is_locked": 1, "lock_message": 1, "warning_message": 1,
+    "emi_amount": 1, "emi_due_date": 1, "uninstall_allowed": 1
+}
 
 @api_router.get("/device/status/{client_id}", response_model=ClientStatusResponse)
 async def get_device_status(client_id: str):
-    client = await db.clients.find_one({"id": client_id})
+    cached = _device_status_cache.get(client_id)
+    if cached is not None:
+        return cached
+    
+    client = await db.clients.find_one({"id": client_id}, DEVICE_STATUS_PROJECTION)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
-    return ClientStatusResponse(
+    status = ClientStatusResponse(
         id=client["id"],
         name=client["name"],
         is_locked=client["is_locked"],
@@ -1275,29 +1912,95 @@ async def get_device_status(client_id: str):
         emi_due_date=client.get("emi_due_date"),
         uninstall_allowed=client.get("uninstall_allowed", False)
     )
+    _device_status_cache.set(client_id, status)
+    return status
+
+# Location pings are coalesced per client and written in bulk off the request path;
+# only the latest position per client within a flush window is kept.
+LOCATION_FLUSH_INTERVAL_SECONDS = 0.1
+# Back off up to this long between flushes while writes keep failing
+LOCATION_FLUSH_MAX_BACKOFF_SECONDS = 5.0
+# Give up on a client's queued ping after this many failed writes
+LOCATION_FLUSH_MAX_ATTEMPTS = 5
+# New client ids are shed once this many are queued
+MAX_PENDING_LOCATIONS = 10000
+_pending_locations = {}
+_location_flush_attempts = {}
+_location_writer_task = None
+
+def _dequeue_locations(batch):
+    """Remove written or abandoned pings, keeping any newer ping queued since the batch was taken"""
+    for client_id, fields in batch:
+        if _pending_locations.get(client_id) is fields:
+            del _pending_locations[client_id]
+            _location_flush_attempts.pop(client_id, None)
+
+async def flush_location_updates() -> bool:
+    """
+    Write all pending location pings with unordered bulk_write calls.
+    A failed batch stays queued without blocking later batches, and is dropped
+    once it has failed LOCATION_FLUSH_MAX_ATTEMPTS times.
+    
+    Returns:
+        True if every batch was written
+    """
+    if not _pending_locations:
+        return True
+    pending = list(_pending_locations.items())
+    all_written = True
+    
+    for start in range(0, len(pending), BULK_WRITE_BATCH_SIZE):
+        batch = pending[start:start + BULK_WRITE_BATCH_SIZE]
+        try:
+            await db.clients.bulk_write(
+                [UpdateOne({"id": client_id}, {"$set": fields}) for client_id, fields in batch],
+                ordered=False
+            )
+        except Exception as e:
+            all_written = False
+            abandoned = []
+            for client_id, fields in batch:
+                attempts = _location_flush_attempts.get(client_id, 0) + 1
+                _location_flush_attempts[client_id] = attempts
+                if attempts >= LOCATION_FLUSH_MAX_ATTEMPTS:
+                    abandoned.append((client_id, fields))
+            logger.error(f"Location flush error for {len(batch)} clients: {str(e)}")
+            if abandoned:
+                logger.error(
+                    f"Dropping location pings for {len(abandoned)} clients after "
+                    f"{LOCATION_FLUSH_MAX_ATTEMPTS} failed attempts"
+                )
+                _dequeue_locations(abandoned)
+            continue
+        _dequeue_locations(batch)
+    return all_written
+
+async def location_writer():
+    """Background loop flushing queued location pings, backing off while writes fail"""
+    delay = LOCATION_FLUSH_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            written = await flush_location_updates()
+        except Exception as e:
+            logger.error(f"Location flush error: {str(e)}")
+            written = False
+        delay = LOCATION_FLUSH_INTERVAL_SECONDS if written else min(delay * 2, LOCATION_FLUSH_MAX_BACKOFF_SECONDS)
 
 @api_router.post("/device/location")
 async def update_device_location(location: LocationUpdate):
-    client = await db.clients.find_one({"id": location.client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    await db.clients.update_one(
-        {"id": location.client_id},
-        {"$set": {
-            "latitude": location.latitude,
-            "longitude": location.longitude,
-            "last_location_update": datetime.utcnow()
-        }}
-    )
+    # The endpoint is unauthenticated; bound the queue so arbitrary ids can't grow it forever
+    if location.client_id not in _pending_locations and len(_pending_locations) >= MAX_PENDING_LOCATIONS:
+        raise RateLimitException("Location updates are backlogged. Please try again later.")
+    _pending_locations[location.client_id] = {
+        "latitude": location.latitude,
+        "longitude": location.longitude,
+        "last_location_update": datetime.utcnow()
+    }
     return {"message": "Location updated successfully"}
 
 @api_router.post("/device/push-token")
 async def update_push_token(token_data: PushTokenUpdate):
-    client = await db.clients.find_one({"id": token_data.client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
     update_fields = {
         "expo_push_token": token_data.push_token
     }
@@ -1305,32 +2008,31 @@ async def update_push_token(token_data: PushTokenUpdate):
     if token_data.admin_id:
         update_fields["admin_id"] = token_data.admin_id
     
-    await db.clients.update_one(
+    result = await db.clients.update_one(
         {"id": token_data.client_id},
         {"$set": update_fields}
     )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Client not found")
     return {"message": "Push token updated"}
 
 @api_router.post("/device/clear-warning/{client_id}")
 async def clear_warning(client_id: str):
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
+    result = await db.clients.update_one({"id": client_id}, {"$set": {"warning_message": ""}})
+    if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Client not found")
-    
-    await db.clients.update_one({"id": client_id}, {"$set": {"warning_message": ""}})
+    invalidate_device_status(client_id)
     return {"message": "Warning cleared"}
 
 @api_router.post("/device/report-admin-status")
 async def report_admin_status(client_id: str, admin_active: bool):
     """Report admin mode status from client device"""
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    await db.clients.update_one(
+    result = await db.clients.update_one(
         {"id": client_id},
         {"$set": {"admin_mode_active": admin_active}}
     )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Client not found")
     
     return {"message": "Admin mode status updated", "admin_active": admin_active}
 
@@ -1339,42 +2041,44 @@ async def report_admin_status(client_id: str, admin_active: bool):
 @api_router.post("/clients/{client_id}/report-tamper")
 async def report_tamper_attempt(client_id: str, tamper_type: str = "unknown"):
     """Report tampering attempt from client device"""
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    current_attempts = client.get("tamper_attempts", 0)
-    
-    await db.clients.update_one(
+    # $inc keeps concurrent reports from overwriting each other's count
+    client = await db.clients.find_one_and_update(
         {"id": client_id},
-        {"$set": {
-            "tamper_attempts": current_attempts + 1,
-            "last_tamper_attempt": datetime.utcnow(),
-            "warning_message": f"Tamper attempt detected: {tamper_type}"
-        }}
+        {
+            "$inc": {"tamper_attempts": 1},
+            "$set": {
+                "last_tamper_attempt": datetime.utcnow(),
+                "warning_message": f"Tamper attempt detected: {tamper_type}"
+            }
+        },
+        projection={"_id": 0, "tamper_attempts": 1},
+        return_document=ReturnDocument.AFTER
     )
+    if not client:
+        raise HTTPException(status_code=404, detail="Client not found")
+    invalidate_device_status(client_id)
     
     logger.warning(f"Tamper attempt on client {client_id}: {tamper_type}")
     
     return {
         "message": "Tamper attempt recorded",
-        "total_attempts": current_attempts + 1,
+        "total_attempts": client["tamper_attempts"],
         "action": "device_locked"
     }
 
 @api_router.post("/clients/{client_id}/report-reboot")
 async def report_reboot(client_id: str):
     """Report device reboot"""
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    await db.clients.update_one(
+    client = await db.clients.find_one_and_update(
         {"id": client_id},
         {"$set": {
             "last_reboot": datetime.utcnow()
-        }}
+        }},
+        projection={"_id": 0, "is_locked": 1, "lock_message": 1},
+        return_document=ReturnDocument.AFTER
     )
+    if not client:
+        raise HTTPException(status_code=404, detail="Client not found")
     
     logger.info(f"Client {client_id} rebooted")
     
@@ -1390,21 +2094,19 @@ async def report_reboot(client_id: str):
 @api_router.post("/loan-plans", response_model=LoanPlan)
 async def create_loan_plan(plan_data: LoanPlanCreate, admin_token: str = Query(...)):
     """Create a new loan plan"""
-    if not await verify_admin_token_header(admin_token):
-        raise AuthenticationException("Invalid admin token")
-    
     # Get admin_id from token
-    token_doc = await db.admin_tokens.find_one({"token": admin_token})
-    if not token_doc:
+    requester_id = await get_token_admin_id(admin_token)
+    if not requester_id:
         raise AuthenticationException("Invalid admin token")
     
     # Create plan with admin_id
     plan_dict = plan_data.dict()
-    plan_dict["admin_id"] = token_doc["admin_id"]
+    plan_dict["admin_id"] = requester_id
     plan = LoanPlan(**plan_dict)
     await db.loan_plans.insert_one(plan.dict())
+    invalidate_loan_plans(requester_id)
     
-    logger.info(f"Loan plan created: {plan.name} by admin {token_doc['admin_id']}")
+    logger.info(f"Loan plan created: {plan.name} by admin {requester_id}")
     return plan
 
 @api_router.get("/loan-plans")
@@ -1414,76 +2116,80 @@ async def get_loan_plans(active_only: bool = Query(default=False), admin_id: Opt
         logger.warning("admin_id not provided for loan plan listing; rejecting request")
         raise ValidationException("admin_id is required for loan plan listings")
     
+    cache_key = (admin_id, active_only)
+    cached = _loan_plans_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     query = {"admin_id": admin_id}
     if active_only:
         query["is_active"] = True
     
     plans = await db.loan_plans.find(query).to_list(100)
-    return [LoanPlan(**p) for p in plans]
+    # Stored documents were validated on write
+    response = [LoanPlan.model_construct(**p) for p in plans]
+    _loan_plans_cache.set(cache_key, response)
+    return response
+
+def plan_scope_filter(plan_id: str, admin_id: Optional[str]) -> dict:
+    """Query filter matching the plan only if it is unowned or owned by admin_id"""
+    if not admin_id:
+        return {"id": plan_id}
+    return {"id": plan_id, "admin_id": {"$in": [admin_id, None, ""]}}
+
+async def raise_plan_scope_miss(plan_id: str):
+    """Raise 403 or 404 after a plan_scope_filter query matched nothing"""
+    if await db.loan_plans.find_one({"id": plan_id}, {"_id": 1}):
+        raise AuthorizationException("Access denied: This loan plan belongs to another admin")
+    raise HTTPException(status_code=404, detail="Loan plan not found")
 
 @api_router.get("/loan-plans/{plan_id}", response_model=LoanPlan)
 async def get_loan_plan(plan_id: str, admin_id: Optional[str] = Query(default=None)):
     """Get a specific loan plan"""
-    plan = await db.loan_plans.find_one({"id": plan_id})
+    # Admin ownership is part of the filter when admin_id is provided
+    plan = await db.loan_plans.find_one(plan_scope_filter(plan_id, admin_id))
     if not plan:
-        raise HTTPException(status_code=404, detail="Loan plan not found")
-    
-    # Check admin ownership if admin_id is provided
-    if admin_id and plan.get("admin_id") and plan["admin_id"] != admin_id:
-        raise AuthorizationException("Access denied: This loan plan belongs to another admin")
+        await raise_plan_scope_miss(plan_id)
     
-    return LoanPlan(**plan)
+    # response_model validates and serializes the document once
+    return plan
 
 @api_router.put("/loan-plans/{plan_id}", response_model=LoanPlan)
 async def update_loan_plan(plan_id: str, plan_data: LoanPlanCreate, admin_token: str = Query(...)):
     """Update a loan plan"""
-    if not await verify_admin_token_header(admin_token):
-        raise AuthenticationException("Invalid admin token")
-    
     # Get admin_id from token
-    token_doc = await db.admin_tokens.find_one({"token": admin_token})
-    if not token_doc:
+    requester_id = await get_token_admin_id(admin_token)
+    if not requester_id:
         raise AuthenticationException("Invalid admin token")
     
-    plan = await db.loan_plans.find_one({"id": plan_id})
-    if not plan:
-        raise HTTPException(status_code=404, detail="Loan plan not found")
-    
-    # Check admin ownership
-    if plan.get("admin_id") and plan["admin_id"] != token_doc["admin_id"]:
-        raise AuthorizationException("Access denied: This loan plan belongs to another admin")
-    
-    await db.loan_plans.update_one(
-        {"id": plan_id},
-        {"$set": plan_data.dict()}
+    # Admin ownership is part of the filter
+    updated_plan = await db.loan_plans.find_one_and_update(
+        plan_scope_filter(plan_id, requester_id),
+        {"$set": plan_data.dict()},
+        return_document=ReturnDocument.AFTER
     )
-    
-    updated_plan = await db.loan_plans.find_one({"id": plan_id})
-    logger.info(f"Loan plan updated: {plan_id} by admin {token_doc['admin_id']}")
+    if not updated_plan:
+        await raise_plan_scope_miss(plan_id)
+    invalidate_loan_plans(updated_plan.get("admin_id"))
+    logger.info(f"Loan plan updated: {plan_id} by admin {requester_id}")
     return LoanPlan(**updated_plan)
 
 @api_router.delete("/loan-plans/{plan_id}")
 async def delete_loan_plan(plan_id: str, admin_token: str = Query(...), force: bool = Query(default=False)):
     """Delete a loan plan permanently. Checks for client usage unless force=true."""
-    if not await verify_admin_token_header(admin_token):
-        raise AuthenticationException("Invalid admin token")
-    
     # Get admin_id from token
-    token_doc = await db.admin_tokens.find_one({"token": admin_token})
-    if not token_doc:
+    requester_id = await get_token_admin_id(admin_token)
+    if not requester_id:
         raise AuthenticationException("Invalid admin token")
     
-    # Check if plan exists and belongs to admin
-    plan = await db.loan_plans.find_one({"id": plan_id})
+    # Load the plan (admin ownership is part of the filter) and count the clients using it concurrently
+    plan_scope = plan_scope_filter(plan_id, requester_id)
+    plan, clients_using_plan = await asyncio.gather(
+        db.loan_plans.find_one(plan_scope, {"_id": 0, "admin_id": 1}),
+        db.clients.count_documents({"loan_plan_id": plan_id})
+    )
     if not plan:
-        raise HTTPException(status_code=404, detail="Loan plan not found")
-    
-    # Check admin ownership
-    if plan.get("admin_id") and plan["admin_id"] != token_doc["admin_id"]:
-        raise AuthorizationException("Access denied: This loan plan belongs to another admin")
-    
-    # Check if any clients are using this loan plan
-    clients_using_plan = await db.clients.count_documents({"loan_plan_id": plan_id})
+        await raise_plan_scope_miss(plan_id)
     
     if clients_using_plan > 0 and not force:
         raise HTTPException(
@@ -1501,12 +2207,13 @@ async def delete_loan_plan(plan_id: str, admin_token: str = Query(...), force: b
         logger.info(f"Cleared loan_plan_id from {clients_using_plan} clients before deleting plan {plan_id}")
     
     # Hard delete - remove from database
-    result = await db.loan_plans.delete_one({"id": plan_id})
+    result = await db.loan_plans.delete_one(plan_scope)
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Loan plan not found")
+    invalidate_loan_plans(plan.get("admin_id"))
     
-    logger.info(f"Loan plan deleted: {plan_id} by admin {token_doc['admin_id']}")
+    logger.info(f"Loan plan deleted: {plan_id} by admin {requester_id}")
     return {
         "message": "Loan plan deleted successfully",
         "clients_affected": clients_using_plan if force else 0
@@ -1527,28 +2234,24 @@ async def compare_emi_methods(
     if annual_rate < 0:
         raise ValidationException("Interest rate cannot be negative")
     
-    comparison = calculate_all_methods(principal, annual_rate, months)
-    
-    # Add savings comparison
-    methods = [comparison["simple_interest"], comparison["reducing_balance"], comparison["flat_rate"]]
-    min_total = min(m["total_amount"] for m in methods)
-    
-    for method in methods:
-        method["savings_vs_highest"] = round(
-            max(m["total_amount"] for m in methods) - method["total_amount"], 2
-        )
-        method["is_cheapest"] = method["total_amount"] == min_total
+    # Quantize the rate so equivalent dashboard queries share a cache entry
+    comparison = compare_all_methods(principal, round(annual_rate, 4), months)
     
-    return comparison
+    # Hand out copies so the cached entry can never be mutated by a caller
+    return {key: dict(method) for key, method in comparison.items()}
 
 @api_router.post("/calculator/amortization")
 async def calculate_amortization_schedule(
     principal: float,
     annual_rate: float,
     months: int,
-    method: str = "reducing_balance"
+    method: str = "reducing_balance",
+    response_format: str = Query(default="json", alias="format")
 ):
-    """Generate month-by-month amortization schedule"""
+    """
+    Generate month-by-month amortization schedule.
+    format=ndjson streams one JSON row per line instead of the JSON envelope.
+    """
     if principal <= 0 or months <= 0:
         raise ValidationException("Principal and months must be positive")
     
@@ -1563,30 +2266,17 @@ async def calculate_amortization_schedule(
     monthly_emi = emi_data["monthly_emi"]
     monthly_rate = (annual_rate / 12) / 100
     
-    schedule = []
-    remaining_principal = principal
-    
-    for month in range(1, months + 1):
-        if method == "reducing_balance":
-            interest_payment = remaining_principal * monthly_rate
-            principal_payment = monthly_emi - interest_payment
-        elif method == "simple_interest":
-            # Simple interest distributed equally
-            interest_payment = emi_data["total_interest"] / months
-            principal_payment = monthly_emi - interest_payment
-        else:  # flat_rate
-            interest_payment = emi_data["total_interest"] / months
-            principal_payment = monthly_emi - interest_payment
-        
-        remaining_principal -= principal_payment
-        
-        schedule.append({
-            "month": month,
-            "emi": round(monthly_emi, 2),
-            "principal": round(principal_payment, 2),
-            "interest": round(interest_payment, 2),
-            "balance": round(max(0, remaining_principal), 2)
-        })
+    # Simple interest and flat rate spread the total interest equally over the tenure
+    interest_per_month = None if method == "reducing_balance" else emi_data["total_interest"] / months
+    
+    if response_format == "ndjson":
+        rows = iter_amortization_schedule(principal, monthly_rate, monthly_emi, months, interest_per_month)
+        return StreamingResponse(
+            (orjson.dumps(row) + b"\n" for row in rows),
+            media_type="application/x-ndjson"
+        )
+    
+    schedule = build_amortization_schedule(principal, monthly_rate, monthly_emi, months, interest_per_month)
     
     return {
         "method": method,
@@ -1601,13 +2291,6 @@ async def calculate_amortization_schedule(
 @api_router.post("/loans/{client_id}/setup")
 async def setup_loan(client_id: str, loan_data: LoanSetup, admin_id: Optional[str] = Query(default=None)):
     """Setup or update loan details for a client"""
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    # Enforce admin scope - ensure client belongs to requesting admin
-    await enforce_client_scope(client, admin_id)
-    
     # Calculate EMI using simple interest
     loan_calc = calculate_simple_interest_emi(
         loan_data.loan_amount,
@@ -1616,7 +2299,6 @@ async def setup_loan(client_id: str, loan_data: LoanSetup, admin_id: Optional[st
     )
     
     # Calculate next payment due date (one month from now)
-    from dateutil.relativedelta import relativedelta
     loan_start = datetime.utcnow()
     next_due = loan_start + relativedelta(months=1)
     
@@ -1633,9 +2315,17 @@ async def setup_loan(client_id: str, loan_data: LoanSetup, admin_id: Optional[st
         "days_overdue": 0
     }
     
-    await db.clients.update_one({"id": client_id}, {"$set": update_data})
+    # Admin scope is part of the filter - ensure client belongs to requesting admin
+    updated_client = await db.clients.find_one_and_update(
+        client_scope_filter(client_id, admin_id),
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated_client:
+        await raise_client_scope_miss(client_id, admin_id)
+    invalidate_device_status(client_id)
+    invalidate_collection_report(updated_client.get("admin_id"))
     
-    updated_client = await db.clients.find_one({"id": client_id})
     return {
         "message": "Loan setup successfully",
         "loan_details": loan_calc,
@@ -1645,16 +2335,12 @@ async def setup_loan(client_id: str, loan_data: LoanSetup, admin_id: Optional[st
 @api_router.post("/loans/{client_id}/payments")
 async def record_payment(client_id: str, payment_data: PaymentCreate, admin_token: str = Query(...)):
     """Record a payment for a client's loan"""
-    # Verify admin token
-    token_doc = await db.admin_tokens.find_one({"token": admin_token})
-    if not token_doc:
-        raise AuthenticationException("Invalid admin token")
-    
-    admin = await db.admins.find_one({"id": token_doc["admin_id"]})
+    # Verify admin token and load the recording admin
+    admin = await resolve_admin(admin_token)
     if not admin:
-        raise AuthenticationException("Admin not found")
+        raise AuthenticationException("Invalid admin token")
     
-    client = await db.clients.find_one({"id": client_id})
+    client = await db.clients.find_one({"id": client_id}, {**CLIENT_SCOPE_PROJECTION, "next_payment_due": 1})
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     await enforce_client_scope(client, admin["id"])
@@ -1671,46 +2357,53 @@ async def record_payment(client_id: str, payment_data: PaymentCreate, admin_toke
     
     await db.payments.insert_one(payment.dict())
     
-    # Update client loan balance
-    total_paid = client.get("total_paid", 0) + payment_data.amount
-    outstanding = client.get("total_amount_due", 0) - total_paid
-    
     # Calculate next payment due date
-    from dateutil.relativedelta import relativedelta
-    current_next_due = client.get("next_payment_due", datetime.utcnow())
+    current_next_due = client.get("next_payment_due") or datetime.utcnow()
     next_payment_due = current_next_due + relativedelta(months=1)
     
-    update_data = {
-        "total_paid": total_paid,
-        "outstanding_balance": max(0, outstanding),
-        "last_payment_date": payment.payment_date,
-        "next_payment_due": next_payment_due if outstanding > 0 else None,
-        "days_overdue": 0  # Reset overdue days on payment
-    }
-    
-    # Auto-unlock if loan is fully paid
-    if outstanding <= 0:
-        update_data["is_locked"] = False
-        update_data["lock_message"] = "Loan fully paid. Device unlocked."
-    
-    await db.clients.update_one({"id": client_id}, {"$set": update_data})
+    # Update the loan balance atomically on the server so concurrent payments can't overwrite each other
+    paid_off = {"$lte": ["$outstanding_balance", 0]}
+    updated = await db.clients.find_one_and_update(
+        {"id": client_id},
+        [
+            {"$set": {"total_paid": {"$add": [{"$ifNull": ["$total_paid", 0]}, payment_data.amount]}}},
+            {"$set": {
+                "outstanding_balance": {"$max": [0, {"$subtract": [{"$ifNull": ["$total_amount_due", 0]}, "$total_paid"]}]},
+                "last_payment_date": payment.payment_date,
+                "days_overdue": 0  # Reset overdue days on payment
+            }},
+            # Auto-unlock if loan is fully paid
+            {"$set": {
+                "next_payment_due": {"$cond": [paid_off, None, next_payment_due]},
+                "is_locked": {"$cond": [paid_off, False, "$is_locked"]},
+                "lock_message": {"$cond": [paid_off, "Loan fully paid. Device unlocked.", "$lock_message"]}
+            }}
+        ],
+        projection={"_id": 0, "total_paid": 1, "outstanding_balance": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Client not found")
+    invalidate_device_status(client_id)
+    invalidate_collection_report(client.get("admin_id"))
     
     logger.info(f"Payment recorded: €{payment_data.amount} for client {client_id} by {admin['username']}")
     
     return {
         "message": "Payment recorded successfully",
-        "payment": payment.dict(),
+        # insert_one adds _id to the dict it was given, so return the model itself
+        "payment": payment,
         "updated_balance": {
-            "total_paid": total_paid,
-            "outstanding_balance": max(0, outstanding),
-            "loan_paid_off": outstanding <= 0
+            "total_paid": updated["total_paid"],
+            "outstanding_balance": updated["outstanding_balance"],
+            "loan_paid_off": updated["outstanding_balance"] <= 0
         }
     }
 
 @api_router.get("/loans/{client_id}/payments")
 async def get_payment_history(client_id: str, admin_id: Optional[str] = Query(default=None)):
     """Get payment history for a client"""
-    client = await db.clients.find_one({"id": client_id})
+    client = await db.clients.find_one({"id": client_id}, CLIENT_SCOPE_PROJECTION)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
@@ -1722,13 +2415,25 @@ async def get_payment_history(client_id: str, admin_id: Optional[str] = Query(de
     return {
         "client_id": client_id,
         "total_payments": len(payments),
-        "payments": [Payment(**p) for p in payments]
+        # Documents come from our own writes, so skip re-validation
+        "payments": [Payment.model_construct(**p) for p in payments]
     }
 
+# Schedule row status keyed by (payment made, due date passed)
+_SCHEDULE_STATUS = {
+    (True, True): "paid",
+    (True, False): "paid",
+    (False, True): "overdue",
+    (False, False): "pending",
+}
+
 @api_router.get("/loans/{client_id}/schedule")
 async def get_payment_schedule(client_id: str, admin_id: Optional[str] = Query(default=None)):
     """Generate payment schedule for a client's loan"""
-    client = await db.clients.find_one({"id": client_id})
+    client = await db.clients.find_one({"id": client_id}, {
+        **CLIENT_SCOPE_PROJECTION, "loan_start_date": 1, "monthly_emi": 1, "total_amount_due": 1,
+        "loan_tenure_months": 1, "loan_amount": 1
+    })
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
@@ -1738,30 +2443,38 @@ async def get_payment_schedule(client_id: str, admin_id: Optional[str] = Query(d
     if not client.get("loan_start_date"):
         raise ValidationException("Loan not set up for this client")
     
-    from dateutil.relativedelta import relativedelta
-    
     schedule = []
+    now = datetime.utcnow()
     start_date = client["loan_start_date"]
     monthly_emi = client.get("monthly_emi", 0)
     outstanding = client.get("total_amount_due", 0)
+    tenure = client.get("loan_tenure_months", 12)
     
-    for month in range(client.get("loan_tenure_months", 12)):
-        due_date = start_date + relativedelta(months=month + 1)
-        
-        # Check if payment was made for this month
-        payment_made = await db.payments.find_one({
+    # Month arithmetic is done once per due date; payments match within 15 days either side
+    due_dates = [start_date + relativedelta(months=month) for month in range(1, tenure + 1)]
+    match_window = timedelta(days=15)
+    
+    # Fetch every payment in the schedule window once instead of querying per month
+    payments = []
+    if due_dates:
+        payments = await db.payments.find({
             "client_id": client_id,
-            "payment_date": {
-                "$gte": due_date - relativedelta(days=15),
-                "$lte": due_date + relativedelta(days=15)
-            }
-        })
+            "payment_date": {"$gte": due_dates[0] - match_window, "$lte": due_dates[-1] + match_window}
+        }, {"_id": 0, "id": 1, "payment_date": 1}).sort("payment_date", 1).to_list(None)
+    payment_dates = [p["payment_date"] for p in payments]
+    
+    for month, due_date in enumerate(due_dates, start=1):
+        # Check if payment was made for this month
+        index = bisect.bisect_left(payment_dates, due_date - match_window)
+        payment_made = None
+        if index < len(payments) and payment_dates[index] <= due_date + match_window:
+            payment_made = payments[index]
         
         schedule.append({
-            "month": month + 1,
-            "due_date": due_date.isoformat(),
+            "month": month,
+            "due_date": due_date,
             "amount_due": monthly_emi,
-            "status": "paid" if payment_made else ("overdue" if due_date < datetime.utcnow() else "pending"),
+            "status": _SCHEDULE_STATUS[(payment_made is not None, due_date < now)],
             "payment_id": payment_made["id"] if payment_made else None
         })
     
@@ -1769,27 +2482,23 @@ async def get_payment_schedule(client_id: str, admin_id: Optional[str] = Query(d
         "client_id": client_id,
         "loan_amount": client.get("loan_amount", 0),
         "monthly_emi": monthly_emi,
-        "total_payments": client.get("loan_tenure_months", 12),
+        "total_payments": tenure,
         "schedule": schedule
     }
 
 @api_router.put("/loans/{client_id}/settings")
 async def update_loan_settings(client_id: str, settings: LoanSettings, admin_id: Optional[str] = Query(default=None)):
     """Update auto-lock settings for a client"""
-    client = await db.clients.find_one({"id": client_id})
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    # Enforce admin scope
-    await enforce_client_scope(client, admin_id)
-    
-    await db.clients.update_one(
-        {"id": client_id},
+    # Admin scope is part of the filter
+    result = await db.clients.update_one(
+        client_scope_filter(client_id, admin_id),
         {"$set": {
             "auto_lock_enabled": settings.auto_lock_enabled,
             "auto_lock_grace_days": settings.auto_lock_grace_days
         }}
     )
+    if result.matched_count == 0:
+        await raise_client_scope_miss(client_id, admin_id)
     
     return {
         "message": "Loan settings updated",
@@ -1811,7 +2520,9 @@ async def calculate_all_late_fees(admin_token: str = Query(...)):
 @api_router.get("/clients/{client_id}/late-fees")
 async def get_client_late_fees(client_id: str):
     """Get late fee details for a specific client"""
-    client = await db.clients.find_one({"id": client_id})
+    client = await db.clients.find_one({"id": client_id}, {
+        "_id": 0, "days_overdue": 1, "late_fees_accumulated": 1, "monthly_emi": 1, "outstanding_balance": 1
+    })
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
@@ -1836,7 +2547,7 @@ async def get_reminders(sent: bool = Query(default=None), limit: int = Query(def
         query["admin_id"] = admin_id
     
     reminders = await db.reminders.find(query).sort("scheduled_date", -1).limit(limit).to_list(limit)
-    return [Reminder(**r) for r in reminders]
+    return [Reminder.model_construct(**r) for r in reminders]
 
 @api_router.get("/clients/{client_id}/reminders")
 async def get_client_reminders(client_id: str, admin_id: Optional[str] = Query(default=None)):
@@ -1847,7 +2558,7 @@ async def get_client_reminders(client_id: str, admin_id: Optional[str] = Query(d
         query["admin_id"] = admin_id
     
     reminders = await db.reminders.find(query).sort("scheduled_date", -1).to_list(50)
-    return [Reminder(**r) for r in reminders]
+    return [Reminder.model_construct(**r) for r in reminders]
 
 @api_router.post("/reminders/create-all")
 async def create_all_reminders(admin_token: str = Query(...)):
@@ -1873,75 +2584,115 @@ async def mark_reminder_sent(reminder_id: str):
 
 # ===================== REPORTS & ANALYTICS =====================
 
+def report_etag(report: dict) -> str:
+    """Strong ETag derived from the report content, stable across cache rebuilds"""
+    return f'"{hashlib.sha256(orjson.dumps(report, option=orjson.OPT_SORT_KEYS)).hexdigest()[:32]}"'
+
+def conditional_report_response(request: Request, response: Response, report: dict, etag: str):
+    """
+    Return the report, or an empty 304 when the caller already holds this version.
+    no-cache makes clients revalidate every time, so a payment shows up immediately.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        presented = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in presented or "*" in presented:
+            return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return report
+
 @api_router.get("/reports/collection")
-async def get_collection_report(admin_id: Optional[str] = Query(default=None)):
+async def get_collection_report(request: Request, response: Response, admin_id: Optional[str] = Query(default=None)):
     """Get collection statistics and metrics"""
+    cached = _report_cache.get(admin_id)
+    if cached is not None:
+        return conditional_report_response(request, response, *cached)
+    
     # Build query filter for admin
     query = {}
     if admin_id:
         query["admin_id"] = admin_id
     
-    # Total clients
-    total_clients = await db.clients.count_documents(query)
-    active_loans = await db.clients.count_documents({**query, "outstanding_balance": {"$gt": 0}})
-    completed_loans = await db.clients.count_documents({**query, "outstanding_balance": 0, "total_paid": {"$gt": 0}})
-    
-    # Financial totals
-    clients = await db.clients.find(query).to_list(1000)
-    clients_by_id = {c.get("id"): c for c in clients if c.get("id")}
-    total_disbursed = sum(c.get("total_amount_due", 0) for c in clients)
-    total_collected = sum(c.get("total_paid", 0) for c in clients)
-    total_outstanding = sum(c.get("outstanding_balance", 0) for c in clients)
-    total_late_fees = sum(c.get("late_fees_accumulated", 0) for c in clients)
+    # This month's window
+    month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month_end = month_start + relativedelta(months=1)
     
-    # Overdue clients
-    overdue_clients = len([c for c in clients if c.get("days_overdue", 0) > 0])
+    # Counts and financial totals are summed server-side in a single pass over the clients
+    client_pipeline = [
+        {"$match": query},
+        {"$group": {
+            "_id": None,
+            "total_clients": {"$sum": 1},
+            "active_loans": {"$sum": {"$cond": [{"$gt": ["$outstanding_balance", 0]}, 1, 0]}},
+            "completed_loans": {"$sum": {"$cond": [
+                {"$and": [{"$eq": ["$outstanding_balance", 0]}, {"$gt": ["$total_paid", 0]}]}, 1, 0
+            ]}},
+            "overdue_clients": {"$sum": {"$cond": [{"$gt": ["$days_overdue", 0]}, 1, 0]}},
+            "total_disbursed": {"$sum": "$total_amount_due"},
+            "total_collected": {"$sum": "$total_paid"},
+            "total_outstanding": {"$sum": "$outstanding_balance"},
+            "total_late_fees": {"$sum": "$late_fees_accumulated"},
+            # Amounts due this month (not yet rolled to next month)
+            "month_due_total": {"$sum": {"$cond": [
+                {"$and": [
+                    {"$gte": ["$next_payment_due", month_start]},
+                    {"$lt": ["$next_payment_due", month_end]},
+                    {"$gt": ["$outstanding_balance", 0]}
+                ]},
+                {"$min": [{"$ifNull": ["$monthly_emi", 0]}, "$outstanding_balance"]},
+                0
+            ]}}
+        }}
+    ]
+    
+    # This month's payments joined to their client for admin scope and profit margin
+    payment_pipeline = [
+        {"$match": {"payment_date": {"$gte": month_start}}},
+        {"$lookup": {"from": "clients", "localField": "client_id", "foreignField": "id", "as": "client"}},
+        {"$unwind": "$client"},
+    ]
+    if admin_id:
+        payment_pipeline.append({"$match": {"client.admin_id": admin_id}})
+    total_due = {"$ifNull": ["$client.total_amount_due", 0]}
+    principal = {"$ifNull": ["$client.loan_amount", 0]}
+    payment_pipeline.append({"$group": {
+        "_id": None,
+        "month_collected": {"$sum": "$amount"},
+        "month_payment_count": {"$sum": 1},
+        # principal may equal total_due for interest-free loans (margin becomes 0)
+        "month_profit": {"$sum": {"$cond": [
+            {"$and": [{"$gt": [total_due, 0]}, {"$gte": [principal, 0]}, {"$lte": [principal, total_due]}]},
+            {"$multiply": ["$amount", {"$divide": [{"$subtract": [total_due, principal]}, total_due]}]},
+            0
+        ]}}
+    }})
+    
+    # The two aggregations are independent - run them concurrently
+    client_totals, month_totals = await asyncio.gather(
+        db.clients.aggregate(client_pipeline).to_list(1),
+        db.payments.aggregate(payment_pipeline).to_list(1)
+    )
+    totals = client_totals[0] if client_totals else {}
+    total_clients = totals.get("total_clients", 0)
+    active_loans = totals.get("active_loans", 0)
+    completed_loans = totals.get("completed_loans", 0)
+    overdue_clients = totals.get("overdue_clients", 0)
+    total_disbursed = totals.get("total_disbursed", 0)
+    total_collected = totals.get("total_collected", 0)
+    total_outstanding = totals.get("total_outstanding", 0)
+    total_late_fees = totals.get("total_late_fees", 0)
+    month_due_total = totals.get("month_due_total", 0)
     
     # Collection rate
     collection_rate = (total_collected / total_disbursed * 100) if total_disbursed > 0 else 0
     
-    # This month's collections
-    from dateutil.relativedelta import relativedelta
-    month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    month_end = month_start + relativedelta(months=1)
-    
-    # Get client IDs for this admin to filter payments
-    client_ids = [c.get("id") for c in clients if c.get("id")]
-    payment_query = {"payment_date": {"$gte": month_start}}
-    if client_ids:
-        payment_query["client_id"] = {"$in": client_ids}
+    month = month_totals[0] if month_totals else {}
+    month_collected = month.get("month_collected", 0)
+    month_payment_count = month.get("month_payment_count", 0)
+    month_profit = month.get("month_profit", 0)
     
-    month_payments = await db.payments.find(payment_query).to_list(1000)
-    month_collected = sum(p.get("amount", 0) for p in month_payments)
-    month_profit = 0
-    for payment in month_payments:
-        client = clients_by_id.get(payment.get("client_id"))
-        if not client:
-            continue
-        total_due = client.get("total_amount_due", 0)
-        if total_due <= 0:
-            continue
-        principal = client.get("loan_amount", 0)
-        if principal < 0 or principal > total_due:
-            continue
-        # principal may equal total_due for interest-free loans (margin becomes 0)
-        margin = (total_due - principal) / total_due
-        month_profit += payment.get("amount", 0) * margin
-    
-    # Amounts due this month (not yet rolled to next month)
-    month_due_total = 0
-    for client in clients:
-        next_due = client.get("next_payment_due")
-        if (
-            isinstance(next_due, datetime)
-            and month_start <= next_due < month_end
-            and client.get("outstanding_balance", 0) > 0
-        ):
-            monthly_due = client.get("monthly_emi", 0) or 0
-            outstanding = client.get("outstanding_balance", 0) or 0
-            month_due_total += min(monthly_due, outstanding)
-    
-    return {
+    report = {
         "overview": {
             "total_clients": total_clients,
             "active_loans": active_loans,
@@ -1957,11 +2708,14 @@ async def get_collection_report(admin_id: Optional[str] = Query(default=None)):
         },
         "this_month": {
             "total_collected": round(month_collected, 2),
-            "number_of_payments": len(month_payments),
+            "number_of_payments": month_payment_count,
             "profit_collected": round(month_profit, 2),
             "due_outstanding": round(month_due_total, 2)
         }
     }
+    etag = report_etag(report)
+    _report_cache.set(admin_id, (report, etag))
+    return conditional_report_response(request, response, report, etag)
 
 @api_router.get("/reports/clients")
 async def get_client_report(admin_id: Optional[str] = Query(default=None)):
@@ -1970,36 +2724,42 @@ async def get_client_report(admin_id: Optional[str] = Query(default=None)):
     if admin_id:
         query["admin_id"] = admin_id
     
-    clients = await db.clients.find(query).to_list(1000)
+    client_projection = {
+        "_id": 0, "id": 1, "name": 1, "outstanding_balance": 1, "total_paid": 1, "days_overdue": 1
+    }
     
-    # Categorize clients
+    # Categorize clients while streaming the cursor
     on_time = []
+    on_time_count = 0
     at_risk = []  # 1-7 days overdue
     defaulted = []  # >7 days overdue
-    completed = []
+    completed_count = 0
     
-    for client in clients:
+    async for client in db.clients.find(query, client_projection):
         days_overdue = client.get("days_overdue", 0)
         outstanding = client.get("outstanding_balance", 0)
         
         if outstanding == 0 and client.get("total_paid", 0) > 0:
-            completed.append(client)
+            completed_count += 1
         elif days_overdue > 7:
             defaulted.append(client)
         elif days_overdue > 0:
             at_risk.append(client)
         else:
-            on_time.append(client)
+            on_time_count += 1
+            # Only the first ten on-time clients are listed in the details
+            if len(on_time) < 10:
+                on_time.append(client)
     
     return {
         "summary": {
-            "on_time_clients": len(on_time),
+            "on_time_clients": on_time_count,
             "at_risk_clients": len(at_risk),
             "defaulted_clients": len(defaulted),
-            "completed_clients": len(completed)
+            "completed_clients": completed_count
         },
         "details": {
-            "on_time": [{"id": c["id"], "name": c["name"], "outstanding": c.get("outstanding_balance", 0)} for c in on_time[:10]],
+            "on_time": [{"id": c["id"], "name": c["name"], "outstanding": c.get("outstanding_balance", 0)} for c in on_time],
             "at_risk": [{"id": c["id"], "name": c["name"], "days_overdue": c.get("days_overdue", 0)} for c in at_risk],
             "defaulted": [{"id": c["id"], "name": c["name"], "days_overdue": c.get("days_overdue", 0)} for c in defaulted],
         }
@@ -2012,42 +2772,50 @@ async def get_financial_report(admin_id: Optional[str] = Query(default=None)):
     if admin_id:
         query["admin_id"] = admin_id
     
-    clients = await db.clients.find(query).to_list(1000)
+    # Fold client totals while streaming the cursor
+    client_ids = []
+    total_principal = 0
+    total_interest = 0
+    total_processing_fees = 0
+    total_late_fees = 0
+    client_projection = {
+        "_id": 0, "id": 1, "loan_amount": 1, "total_amount_due": 1,
+        "processing_fee": 1, "late_fees_accumulated": 1
+    }
+    async for c in db.clients.find(query, client_projection):
+        if c.get("id"):
+            client_ids.append(c["id"])
+        total_principal += c.get("loan_amount", 0)
+        total_interest += c.get("total_amount_due", 0) - c.get("loan_amount", 0)
+        total_processing_fees += c.get("processing_fee", 0)
+        total_late_fees += c.get("late_fees_accumulated", 0)
     
-    # Get client IDs to filter payments
-    client_ids = [c.get("id") for c in clients if c.get("id")]
     payment_query = {}
     if client_ids:
         payment_query["client_id"] = {"$in": client_ids}
     
-    payments = await db.payments.find(payment_query).to_list(1000)
-    
-    # Calculate totals
-    total_principal = sum(c.get("loan_amount", 0) for c in clients)
-    total_interest = sum(c.get("total_amount_due", 0) - c.get("loan_amount", 0) for c in clients)
-    total_processing_fees = sum(c.get("processing_fee", 0) for c in clients)
-    total_late_fees = sum(c.get("late_fees_accumulated", 0) for c in clients)
+    # Monthly breakdown (last 6 months), bucketed by month start
+    now = datetime.utcnow()
+    current_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month_starts = [current_month - relativedelta(months=i) for i in range(6)]
+    monthly_buckets = {month_start: [0, 0] for month_start in month_starts}
     
     # Revenue breakdown
-    total_revenue = sum(p.get("amount", 0) for p in payments)
-    
-    # Monthly breakdown (last 6 months)
-    from dateutil.relativedelta import relativedelta
-    monthly_data = []
-    for i in range(6):
-        month_start = (datetime.utcnow() - relativedelta(months=i)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        month_end = month_start + relativedelta(months=1)
-        
-        month_payments = [p for p in payments if month_start <= p.get("payment_date", datetime.utcnow()) < month_end]
-        month_revenue = sum(p.get("amount", 0) for p in month_payments)
-        
-        monthly_data.append({
-            "month": month_start.strftime("%b %Y"),
-            "revenue": round(month_revenue, 2),
-            "payments_count": len(month_payments)
-        })
-    
-    monthly_data.reverse()
+    total_revenue = 0
+    async for p in db.payments.find(payment_query, {"_id": 0, "amount": 1, "payment_date": 1}):
+        amount = p.get("amount", 0)
+        total_revenue += amount
+        payment_month = p.get("payment_date", now).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        bucket = monthly_buckets.get(payment_month)
+        if bucket is not None:
+            bucket[0] += amount
+            bucket[1] += 1
+    
+    monthly_data = [{
+        "month": month_start.strftime("%b %Y"),
+        "revenue": round(monthly_buckets[month_start][0], 2),
+        "payments_count": monthly_buckets[month_start][1]
+    } for month_start in reversed(month_starts)]
     
     return {
         "totals": {
@@ -2062,10 +2830,27 @@ async def get_financial_report(admin_id: Optional[str] = Query(default=None)):
 
 # ===================== PHONE PRICE LOOKUP =====================
 
+# Estimated used prices based on brand (placeholder logic).
+# keyword -> (priority rank, price); when several brands match, the lowest rank wins,
+# preserving the original check order. Only iPhone/Pixel are matched against the model.
+_BRAND_PRICE = {
+    "apple": (0, 450.0),  # Average used iPhone price
+    "iphone": (0, 450.0),
+    "samsung": (1, 300.0),  # Average used Samsung price
+    "google": (2, 350.0),
+    "pixel": (2, 350.0),
+    "oneplus": (3, 280.0),
+    "xiaomi": (4, 200.0),
+    "huawei": (5, 220.0),
+}
+_MAKE_BRAND_RE = re.compile(r"apple|samsung|google|oneplus|xiaomi|huawei", re.IGNORECASE)
+_MODEL_BRAND_RE = re.compile(r"iphone|pixel", re.IGNORECASE)
+_DEFAULT_USED_PRICE = 250.0  # Default estimate
+
 @api_router.get("/clients/{client_id}/fetch-price")
 async def fetch_phone_price(client_id: str, admin_id: Optional[str] = Query(default=None)):
     """Fetch used phone price for a client's device"""
-    client = await db.clients.find_one({"id": client_id})
+    client = await db.clients.find_one({"id": client_id}, {**CLIENT_SCOPE_PROJECTION, "device_model": 1, "device_make": 1})
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     await enforce_client_scope(client, admin_id)
@@ -2092,24 +2877,12 @@ async def fetch_phone_price(client_id: str, admin_id: Optional[str] = Query(defa
             
             # For demonstration, let's use a basic heuristic based on device make
             # In production, implement proper web scraping or API integration
-            device_make_lower = client.get("device_make", "").lower()
-            
-            # Estimated used prices based on brand (placeholder logic)
-            estimated_price = None
-            if "apple" in device_make_lower or "iphone" in device_model.lower():
-                estimated_price = 450.0  # Average used iPhone price
-            elif "samsung" in device_make_lower:
-                estimated_price = 300.0  # Average used Samsung price
-            elif "google" in device_make_lower or "pixel" in device_model.lower():
-                estimated_price = 350.0
-            elif "oneplus" in device_make_lower:
-                estimated_price = 280.0
-            elif "xiaomi" in device_make_lower:
-                estimated_price = 200.0
-            elif "huawei" in device_make_lower:
-                estimated_price = 220.0
+            # One precompiled pass over the make and one over the model
+            brands = _MAKE_BRAND_RE.findall(client.get("device_make", "")) + _MODEL_BRAND_RE.findall(device_model)
+            if brands:
+                estimated_price = min(_BRAND_PRICE[brand.lower()] for brand in brands)[1]
             else:
-                estimated_price = 250.0  # Default estimate
+                estimated_price = _DEFAULT_USED_PRICE
         
         # Update client with fetched price
         await db.clients.update_one(
@@ -2141,11 +2914,20 @@ async def get_stats(admin_id: Optional[str] = Query(default=None)):
     if admin_id:
         query["admin_id"] = admin_id
     
-    total_clients = await db.clients.count_documents(query)
-    locked_query = {**query, "is_locked": True}
-    locked_devices = await db.clients.count_documents(locked_query)
-    registered_query = {**query, "is_registered": True}
-    registered_devices = await db.clients.count_documents(registered_query)
+    # Count everything in one pass over the admin's clients
+    counts = await db.clients.aggregate([
+        {"$match": query},
+        {"$group": {
+            "_id": None,
+            "total_clients": {"$sum": 1},
+            "locked_devices": {"$sum": {"$cond": [{"$eq": ["$is_locked", True]}, 1, 0]}},
+            "registered_devices": {"$sum": {"$cond": [{"$eq": ["$is_registered", True]}, 1, 0]}}
+        }}
+    ]).to_list(1)
+    totals = counts[0] if counts else {}
+    total_clients = totals.get("total_clients", 0)
+    locked_devices = totals.get("locked_devices", 0)
+    registered_devices = totals.get("registered_devices", 0)
     
     return {
         "total_clients": total_clients,
@@ -2160,8 +2942,10 @@ async def root():
     return {"message": "EMI Phone Lock API is running", "status": "healthy"}
 
 @api_router.get("/health")
-async def health_check():
+async def health_check(response: Response):
     """Health check endpoint for Kubernetes liveness/readiness probes"""
+    # Probes must always see the live database state, never a cached answer
+    response.headers["Cache-Control"] = "no-store"
     try:
         # Try to ping the database
         await client.admin.command('ping')
@@ -2178,79 +2962,199 @@ async def health_check():
 # Include the router in the main app
 app.include_router(api_router)
 
+# Paths commonly requested without the /api prefix
+MISSING_API_PREFIX_TARGETS = frozenset({
+    # Admin endpoints
+    "/admin/login",
+    "/admin/register",
+    "/admin/list",
+    "/admin/change-password",
+    # Client endpoints
+    "/device/register",
+    "/device/status",
+})
+
+def api_prefix_fallback_response(path: str, query_string: bytes) -> Response:
+    """Build the replacement for a 404: a JSON redirect for known prefix mistakes, otherwise an empty 404."""
+    query = f"?{query_string.decode('latin-1')}" if query_string else ""
+    
+    corrected = None
+    # Fix double /api/api prefix
+    if path.startswith("/api/api"):
+        corrected = path.replace("/api/api", "/api", 1) + query
+    # Add missing /api prefix for common admin/client endpoints
+    elif path in MISSING_API_PREFIX_TARGETS:
+        corrected = f"/api{path}{query}"
+    
+    if corrected is None:
+        return Response(status_code=404)
+    return ORJSONResponse(
+        status_code=307,
+        content={"redirect_to": corrected, "detail": "Use /api prefix"},
+        headers={"Location": corrected}
+    )
+
+class APIFastPathMiddleware(CORSMiddleware):
+    """
+    Raw ASGI middleware combining CORS handling with the 404 swallowing/redirect logic.
+    Each request walks a single middleware layer instead of CORSMiddleware plus a
+    BaseHTTPMiddleware, which allocates extra tasks per request.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_headers = Headers(scope=scope)
+        if "origin" in request_headers:
+            if scope["method"] == "OPTIONS" and "access-control-request-method" in request_headers:
+                response = self.preflight_response(request_headers=request_headers)
+                await response(scope, receive, send)
+                return
+            send = functools.partial(self.send, send=send, request_headers=request_headers)
+        
+        not_found = False
+        
+        async def send_wrapper(message):
+            nonlocal not_found
+            if message["type"] == "http.response.start" and message["status"] == 404:
+                # Discard the original 404 body and answer with the fallback instead
+                not_found = True
+                fallback = api_prefix_fallback_response(scope["path"], scope.get("query_string", b""))
+                await fallback(scope, receive, send)
+                return
+            if not not_found:
+                await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
+
 app.add_middleware(
-    CORSMiddleware,
+    APIFastPathMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-@app.middleware("http")
-async def swallow_404_middleware(request, call_next):
-    """Discard body for 404 responses to reduce noise."""
-    def json_redirect(corrected_path: str):
-        return JSONResponse(
-            status_code=307,
-            content={"redirect_to": corrected_path, "detail": "Use /api prefix"},
-            headers={"Location": corrected_path}
-        )
-
-    response = await call_next(request)
-    if response.status_code == 404:
-        path = request.url.path
-        query = f"?{request.url.query}" if request.url.query else ""
-
-        # Fix double /api/api prefix
-        if path.startswith("/api/api"):
-            corrected = path.replace("/api/api", "/api", 1) + query
-            return json_redirect(corrected)
-
-        # Add missing /api prefix for common admin endpoints
-        missing_admin_api_targets = (
-            "/admin/login",
-            "/admin/register",
-            "/admin/list",
-            "/admin/change-password",
-        )
-        if path in missing_admin_api_targets:
-            corrected = f"/api{path}{query}"
-            return json_redirect(corrected)
-
-        # Add missing /api prefix for common client endpoints
-        missing_client_api_targets = (
-            "/device/register",
-            "/device/status",
-        )
-        if path in missing_client_api_targets:
-            corrected = f"/api{path}{query}"
-            return json_redirect(corrected)
+def index_specs():
+    """(collection, keys, options) for every index the application relies on"""
+    return [
+        # Client collection indexes
+        (db.clients, "id", {"unique": True}),
+        (db.clients, "registration_code", {"unique": True, "collation": REGISTRATION_CODE_COLLATION}),
+        (db.clients, "is_locked", {}),
+        (db.clients, "is_registered", {}),
+        # Tenant-scoped client lookups (client_scope_filter, per-admin listings)
+        (db.clients, [("admin_id", 1), ("id", 1)], {}),
+        # Per-admin balance counts in the collection report
+        (db.clients, [("admin_id", 1), ("outstanding_balance", 1)], {}),
+        # Compound index for overdue payment queries
+        (db.clients, [("next_payment_due", 1), ("outstanding_balance", 1)], {}),
+        # Partial index matching the payment reminder job's filter exactly
+        (db.clients, [("payment_reminders_enabled", 1), ("outstanding_balance", 1), ("next_payment_due", 1)], {
+            "name": "payment_reminders_due",
+            "partialFilterExpression": {
+                "outstanding_balance": {"$gt": 0},
+                "payment_reminders_enabled": True
+            }
+        }),
+        # Index for loan plan lookups
+        (db.clients, "loan_plan_id", {}),
+        
+        # Loan plan collection indexes
+        (db.loan_plans, "id", {"unique": True}),
+        (db.loan_plans, [("admin_id", 1), ("id", 1)], {}),
+        
+        # Payment collection indexes - history and schedule windows per client, monthly report range
+        (db.payments, [("client_id", 1), ("payment_date", -1)], {}),
+        (db.payments, "payment_date", {}),
+        
+        # Admin collection indexes
+        (db.admins, "id", {"unique": True}),
+        (db.admins, "username", {"unique": True}),
+        
+        # Admin tokens collection indexes - one token document per admin
+        (db.admin_tokens, "admin_id", {"unique": True}),
+        (db.admin_tokens, "token", {"unique": True}),
+        # Let MongoDB purge expired sessions
+        (db.admin_tokens, "expires_at", {"expireAfterSeconds": 0}),
+    ]
+
+async def delete_duplicate_admin_tokens() -> int:
+    """Delete all but the most recently created token of each admin. Returns the number removed."""
+    duplicates = await db.admin_tokens.aggregate([
+        {"$sort": {"created_at": -1}},
+        {"$group": {"_id": "$admin_id", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ]).to_list(None)
+    stale_ids = [doc_id for group in duplicates for doc_id in group["ids"][1:]]
+    if not stale_ids:
+        return 0
+    result = await db.admin_tokens.delete_many({"_id": {"$in": stale_ids}})
+    return result.deleted_count
+
+async def migrate_legacy_indexes():
+    """Drop indexes whose options changed so create_indexes can recreate them"""
+    token_indexes = await db.admin_tokens.index_information()
+    legacy_admin_id_index = token_indexes.get("admin_id_1")
+    if legacy_admin_id_index and not legacy_admin_id_index.get("unique"):
+        # The unique index cannot be built while an admin still has several tokens,
+        # so keep only the newest token per admin before swapping the index
+        removed = await delete_duplicate_admin_tokens()
+        if removed:
+            logger.info(f"Removed {removed} duplicate admin tokens")
+        logger.info("Replacing non-unique admin_tokens.admin_id index with a unique one")
+        await db.admin_tokens.drop_index("admin_id_1")
+    
+    client_indexes = await db.clients.index_information()
+    legacy_code_index = client_indexes.get("registration_code_1")
+    if legacy_code_index and not legacy_code_index.get("collation"):
+        # Codes differing only by case would block the collated unique index;
+        # keep the legacy index until they are resolved rather than run without one
+        case_duplicates = await db.clients.aggregate([
+            {"$group": {"_id": {"$toUpper": "$registration_code"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$limit": 1}
+        ]).to_list(1)
+        if case_duplicates:
+            logger.warning(
+                f"Keeping case-sensitive registration_code index: codes differing only by case exist "
+                f"(e.g. {case_duplicates[0]['_id']})"
+            )
+        else:
+            logger.info("Replacing registration_code index with a case-insensitive one")
+            await db.clients.drop_index("registration_code_1")
 
-        return Response(status_code=404)
-    return response
+async def create_indexes():
+    """
+    Create all indexes concurrently so startup costs one round-trip instead of one per index.
+    Failures (e.g. an index that already exists with other options) are logged, not raised.
+    """
+    specs = index_specs()
+    results = await asyncio.gather(
+        *(collection.create_index(keys, **options) for collection, keys, options in specs),
+        return_exceptions=True
+    )
+    for (collection, keys, _), result in zip(specs, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Could not create index {keys} on {collection.name}: {result}")
 
 @app.on_event("startup")
 async def startup_db_client():
     """Create database indexes on startup for better performance"""
+    logger.info(
+        f"Argon2 parameters: time_cost={ARGON2_TIME_COST}, memory_cost={ARGON2_MEMORY_COST} KiB, "
+        f"parallelism={ARGON2_PARALLELISM} (~{await bench_password_hashing():.0f} ms per hash)"
+    )
+    
     try:
-        logger.info("Creating database indexes...")
-        # Client collection indexes
-        await db.clients.create_index("id", unique=True)
-        await db.clients.create_index("registration_code", unique=True)
-        await db.clients.create_index("is_locked")
-        await db.clients.create_index("is_registered")
-        # Compound index for overdue payment queries
-        await db.clients.create_index([("next_payment_due", 1), ("outstanding_balance", 1)])
-        # Index for loan plan lookups
-        await db.clients.create_index("loan_plan_id")
-        
-        # Admin collection indexes
-        await db.admins.create_index("id", unique=True)
-        await db.admins.create_index("username", unique=True)
+        # Establish the first connection up front; minPoolSize keeps the rest warm
+        await client.admin.command('ping')
         
-        # Admin tokens collection indexes
-        await db.admin_tokens.create_index("admin_id")
-        await db.admin_tokens.create_index("token", unique=True)
+        logger.info("Creating database indexes...")
+        await migrate_legacy_indexes()
+        await create_indexes()
         
         # Ensure default loan plan exists
         await ensure_default_loan_plan()
@@ -2258,18 +3162,31 @@ async def startup_db_client():
         logger.info("Database indexes created successfully")
     except Exception as e:
         logger.warning(f"Could not create indexes: {e}")
+    
+    global _location_writer_task
+    _location_writer_task = spawn_background_task(location_writer())
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     """Close database connection on shutdown"""
+    if _location_writer_task is not None:
+        _location_writer_task.cancel()
+    try:
+        await flush_location_updates()
+    except Exception as e:
+        logger.error(f"Location flush error: {str(e)}")
+    
     logger.info("Closing database connection...")
     client.close()
+    _password_executor.shutdown(wait=False)
+    if _http_client is not None:
+        await _http_client.aclose()
 
 
 async def ensure_default_loan_plan():
     """Seed required default loan plan if missing."""
     default_name = "One-Time Simple 50% Monthly"
-    existing = await db.loan_plans.find_one({"name": default_name})
+    existing = await db.loan_plans.find_one({"name": default_name}, {"_id": 1})
     if existing:
         return
 
@@ -6,8 +6,11 @@ UPDATED: Added Advanced Loan Management System API Tests
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import sys
+import functools
 from datetime import datetime, timedelta
 
 # Get backend URL from frontend env
@@ -23,6 +26,43 @@ def get_backend_url():
 
 BACKEND_URL = f"{get_backend_url()}/api"
 
+# Retry transient gateway errors and connection resets on the pooled connection.
+# POST and DELETE are left out of the status retries - registering admins or clients twice would
+# skew results, and a delete that succeeded behind a 504 would come back as a false 404.
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.2,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=frozenset(["GET", "PUT"]),
+    raise_on_status=False
+)
+
+# (connect, read) seconds - a hung backend fails the call instead of stalling the run
+DEFAULT_TIMEOUT = (3.05, 10)
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies DEFAULT_TIMEOUT to requests made without an explicit timeout"""
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = DEFAULT_TIMEOUT
+        return super().send(request, **kwargs)
+
+# One pooled keep-alive session for every call instead of a new TCP+TLS connection per request
+SESSION = requests.Session()
+SESSION.mount("https://", TimeoutHTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=RETRY))
+SESSION.mount("http://", TimeoutHTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=RETRY))
+
+# Pre-existing admin account used by the management, delete-client and advanced API tests
+SEEDED_ADMIN_CREDENTIALS = {
+    "username": "karli1987",
+    "password": "nasvakas123"
+}
+
+@functools.lru_cache(maxsize=1)
+def login_existing_admin(base_url):
+    """Seeded admin login, memoized for the whole process so every tester and helper shares one token"""
+    return SESSION.post(f"{base_url}/admin/login", json=SEEDED_ADMIN_CREDENTIALS)
+
 class EMIBackendTester:
     def __init__(self):
         self.base_url = BACKEND_URL
@@ -31,6 +71,10 @@ class EMIBackendTester:
         self.registration_code = None
         self.test_results = []
         
+    def login_existing_admin(self):
+        """Log in as the seeded admin once and reuse the response for every test that needs it"""
+        return login_existing_admin(self.base_url)
+        
     def log_test(self, test_name, success, message, response_data=None):
         """Log test results"""
         status = "✅ PASS" if success else "❌ FAIL"
@@ -46,7 +90,7 @@ class EMIBackendTester:
     def test_health_check(self):
         """Test basic API health"""
         try:
-            response = requests.get(f"{self.base_url}/")
+            response = SESSION.get(f"{self.base_url}/")
             if response.status_code == 200:
                 self.log_test("Health Check", True, "API is running")
                 return True
@@ -65,7 +109,7 @@ class EMIBackendTester:
                 "password": "SecurePass123!"
             }
             
-            response = requests.post(f"{self.base_url}/admin/register", json=admin_data)
+            response = SESSION.post(f"{self.base_url}/admin/register", json=admin_data)
             
             if response.status_code == 200:
                 data = response.json()
@@ -90,13 +134,13 @@ class EMIBackendTester:
             }
             
             # Register
-            reg_response = requests.post(f"{self.base_url}/admin/register", json=admin_data)
+            reg_response = SESSION.post(f"{self.base_url}/admin/register", json=admin_data)
             if reg_response.status_code != 200:
                 self.log_test("Admin Login", False, "Failed to create test admin for login")
                 return False
             
             # Login
-            login_response = requests.post(f"{self.base_url}/admin/login", json=admin_data)
+            login_response = SESSION.post(f"{self.base_url}/admin/login", json=admin_data)
             
             if login_response.status_code == 200:
                 data = login_response.json()
@@ -118,7 +162,7 @@ class EMIBackendTester:
             return False
             
         try:
-            response = requests.get(f"{self.base_url}/admin/verify/{self.admin_token}")
+            response = SESSION.get(f"{self.base_url}/admin/verify/{self.admin_token}")
             
             if response.status_code == 200:
                 data = response.json()
@@ -147,7 +191,7 @@ class EMIBackendTester:
                 "emi_due_date": "2024-02-15"
             }
             
-            response = requests.post(f"{self.base_url}/clients", json=client_data)
+            response = SESSION.post(f"{self.base_url}/clients", json=client_data)
             
             if response.status_code == 200:
                 data = response.json()
@@ -166,7 +210,7 @@ class EMIBackendTester:
     def test_get_all_clients(self):
         """Test getting all clients"""
         try:
-            response = requests.get(f"{self.base_url}/clients")
+            response = SESSION.get(f"{self.base_url}/clients")
             
             if response.status_code == 200:
                 data = response.json()
@@ -188,7 +232,7 @@ class EMIBackendTester:
             return False
             
         try:
-            response = requests.get(f"{self.base_url}/clients/{self.client_id}")
+            response = SESSION.get(f"{self.base_url}/clients/{self.client_id}")
             
             if response.status_code == 200:
                 data = response.json()
@@ -214,7 +258,7 @@ class EMIBackendTester:
                 "emi_amount": 16000.0
             }
             
-            response = requests.put(f"{self.base_url}/clients/{self.client_id}", json=update_data)
+            response = SESSION.put(f"{self.base_url}/clients/{self.client_id}", json=update_data)
             
             if response.status_code == 200:
                 data = response.json()
@@ -241,7 +285,7 @@ class EMIBackendTester:
                 "device_model": "Samsung Galaxy S21"
             }
             
-            response = requests.post(f"{self.base_url}/device/register", json=device_data)
+            response = SESSION.post(f"{self.base_url}/device/register", json=device_data)
             
             if response.status_code == 200:
                 data = response.json()
@@ -263,7 +307,7 @@ class EMIBackendTester:
             
         try:
             lock_message = "Your device has been locked due to overdue EMI payment."
-            response = requests.post(f"{self.base_url}/clients/{self.client_id}/lock?message={lock_message}")
+            response = SESSION.post(f"{self.base_url}/clients/{self.client_id}/lock?message={lock_message}")
             
             if response.status_code == 200:
                 self.log_test("Lock Device", True, "Device locked successfully")
@@ -283,7 +327,7 @@ class EMIBackendTester:
             return False
             
         try:
-            response = requests.post(f"{self.base_url}/clients/{self.client_id}/unlock")
+            response = SESSION.post(f"{self.base_url}/clients/{self.client_id}/unlock")
             
             if response.status_code == 200:
                 self.log_test("Unlock Device", True, "Device unlocked successfully")
@@ -304,7 +348,7 @@ class EMIBackendTester:
             
         try:
             warning_message = "Your EMI payment is due in 3 days. Please make payment to avoid device lock."
-            response = requests.post(f"{self.base_url}/clients/{self.client_id}/warning?message={warning_message}")
+            response = SESSION.post(f"{self.base_url}/clients/{self.client_id}/warning?message={warning_message}")
             
             if response.status_code == 200:
                 self.log_test("Send Warning", True, "Warning sent successfully")
@@ -324,7 +368,7 @@ class EMIBackendTester:
             return False
             
         try:
-            response = requests.get(f"{self.base_url}/device/status/{self.client_id}")
+            response = SESSION.get(f"{self.base_url}/device/status/{self.client_id}")
             
             if response.status_code == 200:
                 data = response.json()
@@ -351,7 +395,7 @@ class EMIBackendTester:
                 "longitude": -122.4194
             }
             
-            response = requests.post(f"{self.base_url}/device/location", json=location_data)
+            response = SESSION.post(f"{self.base_url}/device/location", json=location_data)
             
             if response.status_code == 200:
                 self.log_test("Location Update", True, "Location updated successfully")
@@ -371,7 +415,7 @@ class EMIBackendTester:
             return False
             
         try:
-            response = requests.post(f"{self.base_url}/device/clear-warning/{self.client_id}")
+            response = SESSION.post(f"{self.base_url}/device/clear-warning/{self.client_id}")
             
             if response.status_code == 200:
                 self.log_test("Clear Warning", True, "Warning cleared successfully")
@@ -387,7 +431,7 @@ class EMIBackendTester:
     def test_stats(self):
         """Test stats endpoint"""
         try:
-            response = requests.get(f"{self.base_url}/stats")
+            response = SESSION.get(f"{self.base_url}/stats")
             
             if response.status_code == 200:
                 data = response.json()
@@ -404,16 +448,16 @@ class EMIBackendTester:
     def test_admin_management_login(self):
         """Test login with existing admin for management tests"""
         try:
-            # Login with existing admin credentials
-            login_data = {
-                "username": "karli1987",
-                "password": "nasvakas123"
-            }
-            
-            response = requests.post(f"{self.base_url}/admin/login", json=login_data)
+            # Login with existing admin credentials (shared response - no extra round trip)
+            response = self.login_existing_admin()
             
             if response.status_code == 200:
                 data = response.json()
+                required_fields = ["id", "username", "role", "is_super_admin", "token"]
+                missing = [field for field in required_fields if field not in data]
+                if missing:
+                    self.log_test("Admin Management Login", False, f"Missing login fields: {missing}")
+                    return False
                 self.admin_token = data.get("token")
                 self.log_test("Admin Management Login", True, f"Successfully logged in as {data.get('username')}")
                 return True
@@ -434,7 +478,7 @@ class EMIBackendTester:
         try:
             # Test with valid token
             params = {"admin_token": self.admin_token}
-            response = requests.get(f"{self.base_url}/admin/list", params=params)
+            response = SESSION.get(f"{self.base_url}/admin/list", params=params)
             
             if response.status_code == 200:
                 admins = response.json()
@@ -451,7 +495,7 @@ class EMIBackendTester:
                 
                 # Test with invalid token
                 params = {"admin_token": "invalid_token"}
-                response = requests.get(f"{self.base_url}/admin/list", params=params)
+                response = SESSION.get(f"{self.base_url}/admin/list", params=params)
                 
                 if response.status_code == 401:
                     self.log_test("List Admins API - Invalid Token", True, "Correctly rejected invalid token")
@@ -483,7 +527,7 @@ class EMIBackendTester:
             }
             
             params = {"admin_token": self.admin_token}
-            response = requests.post(f"{self.base_url}/admin/register", json=admin_data, params=params)
+            response = SESSION.post(f"{self.base_url}/admin/register", json=admin_data, params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -498,7 +542,7 @@ class EMIBackendTester:
                 "password": "123"  # Less than 6 characters
             }
             
-            response = requests.post(f"{self.base_url}/admin/register", json=admin_data_short, params=params)
+            response = SESSION.post(f"{self.base_url}/admin/register", json=admin_data_short, params=params)
             
             # Note: The backend doesn't validate password length in the current implementation
             # This test documents the current behavior
@@ -509,11 +553,11 @@ class EMIBackendTester:
             
             # Test 3: Create admin with duplicate username (should fail)
             duplicate_data = {
-                "username": "karli1987",  # Existing username
+                "username": SEEDED_ADMIN_CREDENTIALS["username"],  # Existing username
                 "password": "validpass123"
             }
             
-            response = requests.post(f"{self.base_url}/admin/register", json=duplicate_data, params=params)
+            response = SESSION.post(f"{self.base_url}/admin/register", json=duplicate_data, params=params)
             
             if response.status_code == 400:
                 self.log_test("Create Admin - Duplicate Username", True, "Correctly rejected duplicate username")
@@ -521,7 +565,7 @@ class EMIBackendTester:
                 self.log_test("Create Admin - Duplicate Username", False, f"Should have rejected duplicate username, got status {response.status_code}")
             
             # Test 4: Create admin without token (should fail)
-            response = requests.post(f"{self.base_url}/admin/register", json=admin_data)
+            response = SESSION.post(f"{self.base_url}/admin/register", json=admin_data)
             
             if response.status_code == 401:
                 self.log_test("Create Admin - No Token", True, "Correctly rejected request without token")
@@ -548,7 +592,7 @@ class EMIBackendTester:
             }
             
             params = {"admin_token": self.admin_token}
-            response = requests.post(f"{self.base_url}/admin/change-password", json=password_data, params=params)
+            response = SESSION.post(f"{self.base_url}/admin/change-password", json=password_data, params=params)
             
             if response.status_code == 200:
                 self.log_test("Change Password - Valid", True, "Successfully changed password")
@@ -558,7 +602,7 @@ class EMIBackendTester:
                     "current_password": "newpassword123",
                     "new_password": "nasvakas123"
                 }
-                requests.post(f"{self.base_url}/admin/change-password", json=password_data_back, params=params)
+                SESSION.post(f"{self.base_url}/admin/change-password", json=password_data_back, params=params)
             else:
                 self.log_test("Change Password - Valid", False, f"Status: {response.status_code}, Response: {response.text}")
             
@@ -568,7 +612,7 @@ class EMIBackendTester:
                 "new_password": "newpassword123"
             }
             
-            response = requests.post(f"{self.base_url}/admin/change-password", json=wrong_password_data, params=params)
+            response = SESSION.post(f"{self.base_url}/admin/change-password", json=wrong_password_data, params=params)
             
             if response.status_code == 401:
                 self.log_test("Change Password - Wrong Current", True, "Correctly rejected wrong current password")
@@ -581,7 +625,7 @@ class EMIBackendTester:
                 "new_password": "123"  # Less than 6 characters
             }
             
-            response = requests.post(f"{self.base_url}/admin/change-password", json=short_password_data, params=params)
+            response = SESSION.post(f"{self.base_url}/admin/change-password", json=short_password_data, params=params)
             
             # Note: The backend doesn't validate new password length in the current implementation
             if response.status_code == 200:
@@ -591,12 +635,12 @@ class EMIBackendTester:
                     "current_password": "123",
                     "new_password": "nasvakas123"
                 }
-                requests.post(f"{self.base_url}/admin/change-password", json=password_data_back, params=params)
+                SESSION.post(f"{self.base_url}/admin/change-password", json=password_data_back, params=params)
             else:
                 self.log_test("Change Password - Short New Password", True, "Correctly rejected short new password")
             
             # Test 4: Change password without token
-            response = requests.post(f"{self.base_url}/admin/change-password", json=password_data)
+            response = SESSION.post(f"{self.base_url}/admin/change-password", json=password_data)
             
             if response.status_code == 422:  # FastAPI validation error for missing query param
                 self.log_test("Change Password - No Token", True, "Correctly rejected request without token")
@@ -618,20 +662,20 @@ class EMIBackendTester:
         try:
             # First get current admin ID to test self-deletion prevention
             params = {"admin_token": self.admin_token}
-            response = requests.get(f"{self.base_url}/admin/list", params=params)
+            response = SESSION.get(f"{self.base_url}/admin/list", params=params)
             
             current_admin_id = None
             if response.status_code == 200:
                 admins = response.json()
-                # Find the current admin (karli1987)
+                # Find the current (seeded) admin
                 for admin in admins:
-                    if admin.get("username") == "karli1987":
+                    if admin.get("username") == SEEDED_ADMIN_CREDENTIALS["username"]:
                         current_admin_id = admin.get("id")
                         break
             
             # Test 1: Try to delete own account (should fail)
             if current_admin_id:
-                response = requests.delete(f"{self.base_url}/admin/{current_admin_id}", params=params)
+                response = SESSION.delete(f"{self.base_url}/admin/{current_admin_id}", params=params)
                 
                 if response.status_code == 400:
                     self.log_test("Delete Admin - Self Deletion", True, "Correctly prevented self-deletion")
@@ -640,7 +684,7 @@ class EMIBackendTester:
             
             # Test 2: Delete a test admin (if we created one)
             if test_admin_id:
-                response = requests.delete(f"{self.base_url}/admin/{test_admin_id}", params=params)
+                response = SESSION.delete(f"{self.base_url}/admin/{test_admin_id}", params=params)
                 
                 if response.status_code == 200:
                     self.log_test("Delete Admin - Test Admin", True, "Successfully deleted test admin")
@@ -649,7 +693,7 @@ class EMIBackendTester:
             
             # Test 3: Delete non-existent admin
             fake_admin_id = "non-existent-admin-id"
-            response = requests.delete(f"{self.base_url}/admin/{fake_admin_id}", params=params)
+            response = SESSION.delete(f"{self.base_url}/admin/{fake_admin_id}", params=params)
             
             if response.status_code == 404:
                 self.log_test("Delete Admin - Non-existent", True, "Correctly handled non-existent admin")
@@ -657,7 +701,7 @@ class EMIBackendTester:
                 self.log_test("Delete Admin - Non-existent", False, f"Should have returned 404 for non-existent admin, got status {response.status_code}")
             
             # Test 4: Delete admin without token
-            response = requests.delete(f"{self.base_url}/admin/{fake_admin_id}")
+            response = SESSION.delete(f"{self.base_url}/admin/{fake_admin_id}")
             
             if response.status_code == 422:  # FastAPI validation error for missing query param
                 self.log_test("Delete Admin - No Token", True, "Correctly rejected request without token")
@@ -679,12 +723,7 @@ class EMIBackendTester:
         # Step 1: Login as admin (karli1987/nasvakas123) to get token
         print("\n1. SETUP - Admin Login")
         try:
-            login_data = {
-                "username": "karli1987",
-                "password": "nasvakas123"
-            }
-            
-            response = requests.post(f"{self.base_url}/admin/login", json=login_data)
+            response = self.login_existing_admin()
             if response.status_code == 200:
                 admin_data = response.json()
                 admin_token = admin_data.get("token")
@@ -707,7 +746,7 @@ class EMIBackendTester:
                 "emi_due_date": "2024-02-15"
             }
             
-            response = requests.post(f"{self.base_url}/clients", json=client_data)
+            response = SESSION.post(f"{self.base_url}/clients", json=client_data)
             if response.status_code == 200:
                 client = response.json()
                 test_client_id = client.get("id")
@@ -722,7 +761,7 @@ class EMIBackendTester:
         # Step 3: Get initial stats for comparison
         print("\n3. SETUP - Get Initial Stats")
         try:
-            response = requests.get(f"{self.base_url}/stats")
+            response = SESSION.get(f"{self.base_url}/stats")
             if response.status_code == 200:
                 initial_stats = response.json()
                 initial_total = initial_stats.get("total_clients", 0)
@@ -737,7 +776,7 @@ class EMIBackendTester:
         # Step 4: Verify client exists before deletion
         print("\n4. VERIFICATION - Client Exists")
         try:
-            response = requests.get(f"{self.base_url}/clients/{test_client_id}")
+            response = SESSION.get(f"{self.base_url}/clients/{test_client_id}")
             if response.status_code == 200:
                 client = response.json()
                 self.log_test("Delete Test - Client Exists", True, f"Client verified: {client.get('name')}")
@@ -749,7 +788,7 @@ class EMIBackendTester:
         # Step 5: DELETE CLIENT - Success Case
         print("\n5. DELETE CLIENT - Success Case")
         try:
-            response = requests.delete(f"{self.base_url}/clients/{test_client_id}")
+            response = SESSION.delete(f"{self.base_url}/clients/{test_client_id}")
             if response.status_code == 200:
                 result = response.json()
                 expected_message = "Client deleted successfully"
@@ -767,7 +806,7 @@ class EMIBackendTester:
         # Step 6: Verify client no longer exists
         print("\n6. VERIFICATION - Client Deleted")
         try:
-            response = requests.get(f"{self.base_url}/clients/{test_client_id}")
+            response = SESSION.get(f"{self.base_url}/clients/{test_client_id}")
             if response.status_code == 404:
                 self.log_test("Delete Test - Client Not Found", True, "Deleted client returns 404 as expected")
             else:
@@ -779,7 +818,7 @@ class EMIBackendTester:
         print("\n7. VERIFICATION - Stats Updated")
         if initial_total is not None:
             try:
-                response = requests.get(f"{self.base_url}/stats")
+                response = SESSION.get(f"{self.base_url}/stats")
                 if response.status_code == 200:
                     updated_stats = response.json()
                     updated_total = updated_stats.get("total_clients", 0)
@@ -795,7 +834,7 @@ class EMIBackendTester:
         # Step 8: Verify client not in clients list
         print("\n8. VERIFICATION - Client Not in List")
         try:
-            response = requests.get(f"{self.base_url}/clients")
+            response = SESSION.get(f"{self.base_url}/clients")
             if response.status_code == 200:
                 clients = response.json()
                 client_ids = [c.get("id") for c in clients]
@@ -812,7 +851,7 @@ class EMIBackendTester:
         print("\n9. ERROR CASE - Delete Non-existent Client")
         try:
             fake_client_id = "non-existent-client-id-12345"
-            response = requests.delete(f"{self.base_url}/clients/{fake_client_id}")
+            response = SESSION.delete(f"{self.base_url}/clients/{fake_client_id}")
             if response.status_code == 404:
                 result = response.json()
                 if "not found" in result.get("detail", "").lower():
@@ -830,7 +869,7 @@ class EMIBackendTester:
         
         for invalid_id in invalid_ids:
             try:
-                response = requests.delete(f"{self.base_url}/clients/{invalid_id}")
+                response = SESSION.delete(f"{self.base_url}/clients/{invalid_id}")
                 if response.status_code == 404:
                     self.log_test(f"Delete Test - Invalid ID '{invalid_id}'", True, "Returns 404 as expected")
                 else:
@@ -841,7 +880,7 @@ class EMIBackendTester:
         # Step 11: Try to delete the same client again (double deletion)
         print("\n11. ERROR CASE - Double Deletion")
         try:
-            response = requests.delete(f"{self.base_url}/clients/{test_client_id}")
+            response = SESSION.delete(f"{self.base_url}/clients/{test_client_id}")
             if response.status_code == 404:
                 self.log_test("Delete Test - Double Deletion", True, "Double deletion returns 404 as expected")
             else:
@@ -862,7 +901,7 @@ class EMIBackendTester:
             return False
             
         try:
-            response = requests.delete(f"{self.base_url}/clients/{self.client_id}")
+            response = SESSION.delete(f"{self.base_url}/clients/{self.client_id}")
             
             if response.status_code == 200:
                 self.log_test("Delete Client", True, "Client deleted successfully")
@@ -996,8 +1035,25 @@ class EMIBackendTester:
         
         return failed == 0
 
+    def delete_test_client(self, client_id):
+        """Remove a client created as test data: signal uninstall, then delete"""
+        try:
+            SESSION.post(f"{self.base_url}/clients/{client_id}/allow-uninstall")
+            SESSION.delete(f"{self.base_url}/clients/{client_id}")
+        except Exception as e:
+            print(f"   ⚠️  Could not clean up test client {client_id}: {str(e)}")
+
     def test_advanced_loan_management_apis(self):
         """Test the 3 new API groups: Reports & Analytics, Late Fee Management, Payment Reminders"""
+        # Clients created for these checks are removed afterwards, even if a check fails midway
+        created_client_ids = []
+        try:
+            return self._check_advanced_loan_management_apis(created_client_ids)
+        finally:
+            for client_id in created_client_ids:
+                self.delete_test_client(client_id)
+
+    def _check_advanced_loan_management_apis(self, created_client_ids):
         print("\n" + "="*80)
         print("🏦 ADVANCED LOAN MANAGEMENT SYSTEM API TESTS")
         print("="*80)
@@ -1006,12 +1062,7 @@ class EMIBackendTester:
         # Login with test admin credentials first
         print("\n1. SETUP - Admin Login for Advanced APIs")
         try:
-            login_data = {
-                "username": "karli1987",
-                "password": "nasvakas123"
-            }
-            
-            response = requests.post(f"{self.base_url}/admin/login", json=login_data)
+            response = self.login_existing_admin()
             if response.status_code == 200:
                 admin_data = response.json()
                 admin_token = admin_data.get("token")
@@ -1038,10 +1089,11 @@ class EMIBackendTester:
                 "emi_due_date": "2024-02-15"
             }
             
-            response = requests.post(f"{self.base_url}/clients", json=client_data)
+            response = SESSION.post(f"{self.base_url}/clients", json=client_data)
             if response.status_code == 200:
                 client = response.json()
                 test_client_id = client.get("id")
+                created_client_ids.append(test_client_id)
                 self.log_test("Advanced APIs - Create Test Client", True, f"Test client created: {test_client_id}")
                 
                 # Setup loan for the client
@@ -1055,7 +1107,7 @@ class EMIBackendTester:
                     "loan_tenure_months": 12
                 }
                 
-                setup_response = requests.post(f"{self.base_url}/loans/{test_client_id}/setup", json=loan_setup_data)
+                setup_response = SESSION.post(f"{self.base_url}/loans/{test_client_id}/setup", json=loan_setup_data)
                 if setup_response.status_code == 200:
                     self.log_test("Advanced APIs - Loan Setup", True, "Test loan setup successful")
                 else:
@@ -1071,69 +1123,54 @@ class EMIBackendTester:
         # Test Reports & Analytics APIs
         print("\n3. REPORTS & ANALYTICS APIs")
         
-        # Test Collection Report
-        try:
-            response = requests.get(f"{self.base_url}/reports/collection")
-            if response.status_code == 200:
-                data = response.json()
-                required_keys = ["overview", "financial", "this_month"]
-                if all(key in data for key in required_keys):
-                    self.log_test("Reports - Collection Report", True, f"Collection report retrieved with all required sections")
-                    print(f"   📊 Total Clients: {data['overview'].get('total_clients', 'N/A')}")
-                    print(f"   📊 Active Loans: {data['overview'].get('active_loans', 'N/A')}")
-                    print(f"   📊 Collection Rate: {data['financial'].get('collection_rate', 'N/A')}%")
-                else:
-                    missing = [k for k in required_keys if k not in data]
-                    self.log_test("Reports - Collection Report", False, f"Missing keys: {missing}")
-            else:
-                self.log_test("Reports - Collection Report", False, f"Status {response.status_code}: {response.text}")
-        except Exception as e:
-            self.log_test("Reports - Collection Report", False, f"Error: {str(e)}")
-        
-        # Test Client Report
-        try:
-            response = requests.get(f"{self.base_url}/reports/clients")
-            if response.status_code == 200:
-                data = response.json()
-                required_keys = ["summary", "details"]
-                if all(key in data for key in required_keys):
-                    self.log_test("Reports - Client Report", True, f"Client report retrieved with categorization")
-                    print(f"   📊 On-time Clients: {data['summary'].get('on_time_clients', 'N/A')}")
-                    print(f"   📊 At-risk Clients: {data['summary'].get('at_risk_clients', 'N/A')}")
-                    print(f"   📊 Defaulted Clients: {data['summary'].get('defaulted_clients', 'N/A')}")
-                else:
-                    missing = [k for k in required_keys if k not in data]
-                    self.log_test("Reports - Client Report", False, f"Missing keys: {missing}")
-            else:
-                self.log_test("Reports - Client Report", False, f"Status {response.status_code}: {response.text}")
-        except Exception as e:
-            self.log_test("Reports - Client Report", False, f"Error: {str(e)}")
+        # The three report endpoints share one check: status 200, required sections present
+        report_checks = [
+            ("Reports - Collection Report", "collection", ["overview", "financial", "this_month"],
+             "Collection report retrieved with all required sections",
+             lambda data: [
+                 f"Total Clients: {data['overview'].get('total_clients', 'N/A')}",
+                 f"Active Loans: {data['overview'].get('active_loans', 'N/A')}",
+                 f"Collection Rate: {data['financial'].get('collection_rate', 'N/A')}%",
+             ]),
+            ("Reports - Client Report", "clients", ["summary", "details"],
+             "Client report retrieved with categorization",
+             lambda data: [
+                 f"On-time Clients: {data['summary'].get('on_time_clients', 'N/A')}",
+                 f"At-risk Clients: {data['summary'].get('at_risk_clients', 'N/A')}",
+                 f"Defaulted Clients: {data['summary'].get('defaulted_clients', 'N/A')}",
+             ]),
+            ("Reports - Financial Report", "financial", ["totals", "monthly_trend"],
+             "Financial report retrieved with trend data",
+             lambda data: [
+                 f"Total Revenue: €{data['totals'].get('total_revenue', 'N/A')}",
+                 f"Principal Disbursed: €{data['totals'].get('principal_disbursed', 'N/A')}",
+                 f"Monthly Trend Records: {len(data.get('monthly_trend', []))}",
+             ]),
+        ]
         
-        # Test Financial Report
-        try:
-            response = requests.get(f"{self.base_url}/reports/financial")
-            if response.status_code == 200:
-                data = response.json()
-                required_keys = ["totals", "monthly_trend"]
-                if all(key in data for key in required_keys):
-                    self.log_test("Reports - Financial Report", True, f"Financial report retrieved with trend data")
-                    print(f"   📊 Total Revenue: €{data['totals'].get('total_revenue', 'N/A')}")
-                    print(f"   📊 Principal Disbursed: €{data['totals'].get('principal_disbursed', 'N/A')}")
-                    print(f"   📊 Monthly Trend Records: {len(data.get('monthly_trend', []))}")
+        for test_name, path, required_keys, success_message, summarize in report_checks:
+            try:
+                response = SESSION.get(f"{self.base_url}/reports/{path}")
+                if response.status_code == 200:
+                    data = response.json()
+                    if all(key in data for key in required_keys):
+                        self.log_test(test_name, True, success_message)
+                        for line in summarize(data):
+                            print(f"   📊 {line}")
+                    else:
+                        missing = [k for k in required_keys if k not in data]
+                        self.log_test(test_name, False, f"Missing keys: {missing}")
                 else:
-                    missing = [k for k in required_keys if k not in data]
-                    self.log_test("Reports - Financial Report", False, f"Missing keys: {missing}")
-            else:
-                self.log_test("Reports - Financial Report", False, f"Status {response.status_code}: {response.text}")
-        except Exception as e:
-            self.log_test("Reports - Financial Report", False, f"Error: {str(e)}")
+                    self.log_test(test_name, False, f"Status {response.status_code}: {response.text}")
+            except Exception as e:
+                self.log_test(test_name, False, f"Error: {str(e)}")
         
         # Test Late Fee Management APIs
         print("\n4. LATE FEE MANAGEMENT APIs")
         
         # Test Calculate All Late Fees (requires admin token)
         try:
-            response = requests.post(f"{self.base_url}/late-fees/calculate-all?admin_token={admin_token}")
+            response = SESSION.post(f"{self.base_url}/late-fees/calculate-all", params={"admin_token": admin_token})
             if response.status_code == 200:
                 data = response.json()
                 self.log_test("Late Fees - Calculate All", True, f"Late fees calculation triggered: {data.get('message', 'Success')}")
@@ -1144,7 +1181,7 @@ class EMIBackendTester:
         
         # Test Get Client Late Fees
         try:
-            response = requests.get(f"{self.base_url}/clients/{test_client_id}/late-fees")
+            response = SESSION.get(f"{self.base_url}/clients/{test_client_id}/late-fees")
             if response.status_code == 200:
                 data = response.json()
                 required_keys = ["client_id", "days_overdue", "late_fees_accumulated", "monthly_emi", "outstanding_with_fees"]
@@ -1166,18 +1203,18 @@ class EMIBackendTester:
         
         # Test Get All Reminders
         try:
-            response = requests.get(f"{self.base_url}/reminders")
+            response = SESSION.get(f"{self.base_url}/reminders")
             if response.status_code == 200:
                 data = response.json()
                 self.log_test("Reminders - Get All", True, f"All reminders retrieved ({len(data)} reminders)")
                 
                 # Test with filters
-                response_unsent = requests.get(f"{self.base_url}/reminders?sent=false")
+                response_unsent = SESSION.get(f"{self.base_url}/reminders?sent=false")
                 if response_unsent.status_code == 200:
                     unsent_data = response_unsent.json()
                     self.log_test("Reminders - Get Unsent", True, f"Unsent reminders retrieved ({len(unsent_data)} unsent)")
                 
-                response_sent = requests.get(f"{self.base_url}/reminders?sent=true")
+                response_sent = SESSION.get(f"{self.base_url}/reminders?sent=true")
                 if response_sent.status_code == 200:
                     sent_data = response_sent.json()
                     self.log_test("Reminders - Get Sent", True, f"Sent reminders retrieved ({len(sent_data)} sent)")
@@ -1189,7 +1226,7 @@ class EMIBackendTester:
         
         # Test Get Client Reminders
         try:
-            response = requests.get(f"{self.base_url}/clients/{test_client_id}/reminders")
+            response = SESSION.get(f"{self.base_url}/clients/{test_client_id}/reminders")
             if response.status_code == 200:
                 data = response.json()
                 self.log_test("Reminders - Client Reminders", True, f"Client reminders retrieved ({len(data)} reminders)")
@@ -1206,7 +1243,7 @@ class EMIBackendTester:
         
         # Test Create All Reminders (requires admin token)
         try:
-            response = requests.post(f"{self.base_url}/reminders/create-all?admin_token={admin_token}")
+            response = SESSION.post(f"{self.base_url}/reminders/create-all", params={"admin_token": admin_token})
             if response.status_code == 200:
                 data = response.json()
                 self.log_test("Reminders - Create All", True, f"Reminders creation triggered: {data.get('message', 'Success')}")
@@ -1218,14 +1255,14 @@ class EMIBackendTester:
         # Test Mark Reminder as Sent
         try:
             # Get reminders to find one to mark as sent
-            get_response = requests.get(f"{self.base_url}/reminders?sent=false")
+            get_response = SESSION.get(f"{self.base_url}/reminders?sent=false")
             if get_response.status_code == 200:
                 reminders = get_response.json()
                 if reminders and len(reminders) > 0:
                     test_reminder_id = reminders[0].get("id")
                     
                     # Mark reminder as sent
-                    response = requests.post(f"{self.base_url}/reminders/{test_reminder_id}/mark-sent")
+                    response = SESSION.post(f"{self.base_url}/reminders/{test_reminder_id}/mark-sent")
                     if response.status_code == 200:
                         data = response.json()
                         self.log_test("Reminders - Mark Sent", True, f"Reminder marked as sent: {data.get('message', 'Success')}")
@@ -1244,13 +1281,13 @@ class EMIBackendTester:
         # Test invalid client ID
         try:
             invalid_id = "invalid-client-id-12345"
-            response = requests.get(f"{self.base_url}/clients/{invalid_id}/late-fees")
+            response = SESSION.get(f"{self.base_url}/clients/{invalid_id}/late-fees")
             if response.status_code == 404:
                 self.log_test("Error Handling - Invalid Client ID (Late Fees)", True, "Invalid client ID properly handled")
             else:
                 self.log_test("Error Handling - Invalid Client ID (Late Fees)", False, f"Expected 404, got {response.status_code}")
             
-            response = requests.get(f"{self.base_url}/clients/{invalid_id}/reminders")
+            response = SESSION.get(f"{self.base_url}/clients/{invalid_id}/reminders")
             if response.status_code == 404:
                 self.log_test("Error Handling - Invalid Client ID (Reminders)", True, "Invalid client ID properly handled")
             else:
@@ -1261,14 +1298,14 @@ class EMIBackendTester:
         # Test authentication requirements
         try:
             # Test late fees calculation without token
-            response = requests.post(f"{self.base_url}/late-fees/calculate-all")
+            response = SESSION.post(f"{self.base_url}/late-fees/calculate-all")
             if response.status_code == 401:
                 self.log_test("Authentication - Late Fees Requires Token", True, "Correctly requires authentication")
             else:
                 self.log_test("Authentication - Late Fees Requires Token", False, f"Expected 401, got {response.status_code}")
             
             # Test reminders creation without token
-            response = requests.post(f"{self.base_url}/reminders/create-all")
+            response = SESSION.post(f"{self.base_url}/reminders/create-all")
             if response.status_code == 401:
                 self.log_test("Authentication - Reminders Requires Token", True, "Correctly requires authentication")
             else:
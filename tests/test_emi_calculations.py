@@ -0,0 +1,87 @@
+"""
+EMI calculator tests.
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from server import (
+    calculate_reducing_balance_emi,
+    calculate_simple_interest_emi,
+    calculate_flat_rate_emi,
+    calculate_late_fee,
+    calculate_late_fees,
+    build_amortization_schedule,
+)
+
+
+def test_reducing_balance_emi_matches_closed_form():
+    """Test reducing balance EMI against the standard formula"""
+    principal, annual_rate, months = 100000, 12, 24
+    monthly_rate = annual_rate / 12 / 100
+    power = (1 + monthly_rate) ** months
+    expected = principal * monthly_rate * power / (power - 1)
+    
+    result = calculate_reducing_balance_emi(principal, annual_rate, months)
+    
+    assert result["monthly_emi"] == round(expected, 2)
+    assert result["total_interest"] == round(expected * months - principal, 2)
+
+
+def test_reducing_balance_emi_tiny_rate_approaches_zero_interest():
+    """Test that a near-zero rate converges on principal / months"""
+    result = calculate_reducing_balance_emi(1200, 1e-9, 12)
+    
+    assert result["monthly_emi"] == 100.0
+    assert result["total_interest"] == 0.0
+
+
+def test_zero_rate_emi():
+    """Test zero interest across methods"""
+    assert calculate_reducing_balance_emi(1200, 0, 12)["monthly_emi"] == 100.0
+    assert calculate_simple_interest_emi(1200, 0, 12)["monthly_emi"] == 100.0
+    assert calculate_flat_rate_emi(1200, 0, 12)["monthly_emi"] == 100.0
+
+
+def test_vectorized_late_fees_match_scalar():
+    """Test that the vectorized late fee calculation matches the scalar one"""
+    emis = [100.0, 250.5, 80.0, 0.0]
+    rates = [2.0, 3.5, 2.0, 2.0]
+    days = [30, 45, 0, 10]
+    
+    expected = [calculate_late_fee(e, r, d) for e, r, d in zip(emis, rates, days)]
+    
+    assert calculate_late_fees(emis, rates, days).tolist() == expected
+
+
+def test_amortization_schedule_matches_iterative():
+    """Test the closed-form amortization schedule against month-by-month accrual"""
+    principal, annual_rate, months = 50000, 10.5, 36
+    monthly_rate = annual_rate / 12 / 100
+    monthly_emi = calculate_reducing_balance_emi(principal, annual_rate, months)["monthly_emi"]
+    
+    schedule = build_amortization_schedule(principal, monthly_rate, monthly_emi, months)
+    
+    remaining = principal
+    for row in schedule:
+        interest = remaining * monthly_rate
+        remaining -= monthly_emi - interest
+        assert abs(row["interest"] - round(interest, 2)) <= 0.01
+        assert abs(row["principal"] - round(monthly_emi - interest, 2)) <= 0.01
+        assert abs(row["balance"] - round(max(0, remaining), 2)) <= 0.01
+    
+    assert [row["month"] for row in schedule] == list(range(1, months + 1))
+
+
+def test_amortization_schedule_fixed_interest():
+    """Test flat-rate schedules spread interest evenly and reach zero"""
+    emi_data = calculate_flat_rate_emi(1200, 10, 12)
+    schedule = build_amortization_schedule(
+        1200, 0, emi_data["monthly_emi"], 12, emi_data["total_interest"] / 12
+    )
+    
+    assert {row["interest"] for row in schedule} == {10.0}
+    assert {row["principal"] for row in schedule} == {100.0}
+    assert schedule[-1]["balance"] == 0.0
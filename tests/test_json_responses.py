@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 
 from backend.server import app
@@ -28,3 +30,48 @@ def test_client_registration_double_prefix_returns_json():
     assert response.status_code == 307
     assert response.headers["content-type"].startswith("application/json")
     assert response.json()["redirect_to"].endswith("/api/clients")
+
+
+def test_unknown_path_returns_empty_404():
+    response = client.get("/does-not-exist")
+
+    assert response.status_code == 404
+    assert response.content == b""
+
+
+def test_cors_headers_added_to_redirects():
+    response = client.post(
+        "/admin/login",
+        json={"username": "user", "password": "pass"},
+        headers={"Origin": "https://example.com"},
+        follow_redirects=False,
+    )
+
+    assert response.status_code == 307
+    assert response.headers["access-control-allow-origin"] == "*"
+
+
+def test_cors_preflight_handled():
+    response = client.options(
+        "/api/admin/login",
+        headers={
+            "Origin": "https://example.com",
+            "Access-Control-Request-Method": "POST",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "https://example.com"
+
+
+def test_amortization_streams_ndjson():
+    response = client.post(
+        "/api/calculator/amortization",
+        params={"principal": 1200, "annual_rate": 0, "months": 12, "format": "ndjson"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["month"] for row in rows] == list(range(1, 13))
+    assert rows[-1]["balance"] == 0.0
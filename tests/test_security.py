@@ -10,10 +10,15 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 from server import (
     hash_password,
     verify_password,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
     mask_email,
     mask_phone,
     mask_sensitive_data,
     SecureQueryBuilder,
+    SlidingWindowRateLimiter,
+    TTLCache,
     ValidationException
 )
 
@@ -37,6 +42,22 @@ def test_argon2_password_hashing():
     print("✓ Argon2id password hashing test passed")
 
 
+def test_async_password_hashing():
+    """Test that the executor-backed hashing helpers round-trip"""
+    import asyncio
+    
+    password = "AsyncPassword123!"
+    
+    async def run():
+        hashed = await hash_password_async(password)
+        assert await verify_password_async(password, hashed), "Password verification should succeed"
+        assert not await verify_password_async("WrongPassword", hashed), "Wrong password should fail"
+    
+    asyncio.run(run())
+    
+    print("✓ Async password hashing test passed")
+
+
 def test_legacy_sha256_compatibility():
     """Test that legacy SHA-256 hashes still work"""
     import hashlib
@@ -52,9 +73,26 @@ def test_legacy_sha256_compatibility():
     # Wrong password should fail
     assert not verify_password("WrongPassword", legacy_hash), "Wrong password should fail"
     
+    # Unrecognised hash formats are rejected outright
+    assert not verify_password(password, "$2b$12$notarealbcrypthash"), "Unknown hash format should fail"
+    
     print("✓ Legacy SHA-256 compatibility test passed")
 
 
+def test_password_needs_rehash():
+    """Test that legacy and outdated hashes are flagged for rehashing"""
+    import hashlib
+    from argon2 import PasswordHasher
+    
+    assert not password_needs_rehash(hash_password("CurrentParams123")), "Current hash should be kept"
+    assert password_needs_rehash(hashlib.sha256(b"legacy").hexdigest()), "Legacy hash should be migrated"
+    
+    weaker_hash = PasswordHasher(time_cost=1, memory_cost=19456, parallelism=1).hash("OldParams123")
+    assert password_needs_rehash(weaker_hash), "Hash with old parameters should be migrated"
+    
+    print("✓ Password rehash detection test passed")
+
+
 def test_email_masking():
     """Test email address masking"""
     assert mask_email("john@example.com") == "j**n@example.com"
@@ -160,18 +198,65 @@ def test_query_sanitization():
     print("✓ Query sanitization test passed")
 
 
+def test_sliding_window_rate_limiter():
+    """Test that the rate limiter caps hits per key within the window"""
+    limiter = SlidingWindowRateLimiter(limit=2, window_seconds=60)
+    
+    assert limiter.hit("10.0.0.1")
+    assert limiter.hit("10.0.0.1")
+    assert not limiter.hit("10.0.0.1"), "Third hit in the window should be rejected"
+    
+    # Other callers are tracked independently
+    assert limiter.hit("10.0.0.2")
+    
+    # Once full, the least recently seen caller is forgotten first
+    limiter.MAX_TRACKED_KEYS = 2
+    assert limiter.hit("10.0.0.3")
+    assert "10.0.0.1" not in limiter._hits
+    assert "10.0.0.2" in limiter._hits
+    
+    print("✓ Sliding window rate limiter test passed")
+
+
+def test_ttl_cache_expiry_and_bound():
+    """Test that the TTL cache expires entries and respects its size bound"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    
+    # Oldest entry is evicted once full
+    cache.set("c", 3)
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    
+    # Entries past their TTL are treated as missing
+    cache.set("expired", "x", ttl=-1)
+    assert cache.get("expired") is None
+    
+    assert cache.pop("c") == 3
+    assert cache.get("c") is None
+    
+    print("✓ TTL cache test passed")
+
+
 if __name__ == "__main__":
     print("Running security tests...")
     print()
     
     test_argon2_password_hashing()
+    test_async_password_hashing()
     test_legacy_sha256_compatibility()
+    test_password_needs_rehash()
     test_email_masking()
     test_phone_masking()
     test_sensitive_data_masking()
     test_secure_query_builder_validation()
     test_secure_query_building()
     test_query_sanitization()
+    test_sliding_window_rate_limiter()
+    test_ttl_cache_expiry_and_bound()
     
     print()
     print("=" * 50)